@@ -4,7 +4,7 @@ Run: `python smoke_test.py`
 
 What it validates:
 1. Modules import without errors
-2. Can build a FAISS index from synthetic embeddings
+2. Can build a FAISS HNSW index (same graph search as production) from synthetic embeddings
 3. EmbeddingRetriever.search returns structured results
 
 This does NOT call external APIs; embeddings are random to keep it offline.
@@ -39,16 +39,18 @@ metadata = [
     for i in range(N)
 ]
 
-index = build_faiss_index(embeddings.tolist(), index_type="flat")
+index = build_faiss_index(embeddings, index_type="hnsw", m=16, ef_construction=100)
+index.hnsw.efSearch = 32
+assert index.hnsw.efSearch == 32, "HNSW efSearch did not round-trip"
 def _fake_embed(batch, model=None):
-    out = []
-    for text in batch:
-        vec = np.zeros(DIM, dtype="float32")
-        for j, c in enumerate(text.encode("utf-8")):
-            vec[j % DIM] += c
-        norm = np.linalg.norm(vec) or 1.0
-        out.append((vec / norm).tolist())
-    return out
+    """Byte-histogram embedding: byte j of each text adds to dimension j % DIM."""
+    out = np.empty((len(batch), DIM), dtype="float32")
+    for row, text in enumerate(batch):
+        b = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+        out[row] = np.bincount(np.arange(b.size) % DIM, weights=b, minlength=DIM)
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return out / norms
 
 retriever = EmbeddingRetriever(index, metadata, embed_fn=_fake_embed)
 
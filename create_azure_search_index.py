@@ -4,11 +4,22 @@ Create Azure Search Index from Cosmos DB Data
 
 This script:
 1. Loads chunks from Cosmos DB (already uploaded with headers)
-2. Generates embeddings for all chunks
-3. Creates Azure Search index and uploads vectors
+2. Creates the Azure Search index
+3. Generates embeddings for all chunks and uploads each slice as soon as it
+   is embedded, so the two network-bound stages overlap
+
+Embeddings and chunks are saved under cache/ afterwards, so the upload can be
+redone with `--resume` without touching Cosmos DB or Azure OpenAI again.
+
+Each successful run also records the newest Cosmos `_ts` it indexed; with
+`--incremental` only chunks written since then are read, embedded and uploaded
+(chunks deleted from Cosmos are not removed from the index).
 
 Can be run from WSL2 or Azure Cloud Shell if DNS issues occur.
 """
+import argparse
+import asyncio
+import json
 import os
 import sys
 from pathlib import Path
@@ -22,11 +33,49 @@ env_path = Path(__file__).parent / '.env'
 load_dotenv(env_path, override=True)
 
 from rag import config, azure_cosmos, azure_search
-from rag.embeddings import get_embeddings_batch
+from rag.models import Chunk
 import numpy as np
-import time
 
-def create_search_index():
+RESUME_EMBEDDINGS_PATH = config.CACHE_DIR / "search_upload_embeddings.npz"
+RESUME_CHUNKS_PATH = config.CACHE_DIR / "search_upload_chunks.json"
+HIGH_WATER_MARK_PATH = config.CACHE_DIR / "search_high_water_mark.json"
+
+
+def save_upload_artifacts(chunks, embeddings):
+    """Persist the inputs of the upload step so it can be retried on its own."""
+    ids = np.array([c.chunk_id for c in chunks])
+    np.savez(RESUME_EMBEDDINGS_PATH, ids=ids, vecs=embeddings)
+    RESUME_CHUNKS_PATH.write_text(
+        json.dumps([c.__dict__ for c in chunks], ensure_ascii=False), encoding="utf-8"
+    )
+
+
+def load_upload_artifacts():
+    """Load chunks and embeddings saved by a previous run, checking they line up."""
+    chunks = [Chunk(**c) for c in json.loads(RESUME_CHUNKS_PATH.read_text("utf-8"))]
+    with np.load(RESUME_EMBEDDINGS_PATH) as data:
+        ids, embeddings = data["ids"], data["vecs"]
+    if [c.chunk_id for c in chunks] != ids.tolist():
+        raise RuntimeError("Saved chunks and embeddings are out of sync; rerun without --resume")
+    return chunks, embeddings
+
+
+def load_high_water_mark():
+    """Newest Cosmos _ts already uploaded to this index (0 if never recorded)."""
+    if not HIGH_WATER_MARK_PATH.exists():
+        return 0
+    saved = json.loads(HIGH_WATER_MARK_PATH.read_text("utf-8"))
+    return saved["ts"] if saved.get("index") == config.AZURE_SEARCH_INDEX_NAME else 0
+
+
+def save_high_water_mark(ts):
+    HIGH_WATER_MARK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    HIGH_WATER_MARK_PATH.write_text(
+        json.dumps({"index": config.AZURE_SEARCH_INDEX_NAME, "ts": ts}), encoding="utf-8"
+    )
+
+
+def create_search_index(resume: bool = False, incremental: bool = False):
     print("=" * 70)
     print("AZURE SEARCH INDEX CREATION")
     print("=" * 70)
@@ -35,10 +84,30 @@ def create_search_index():
     print(f"Index Name: {config.AZURE_SEARCH_INDEX_NAME}")
     print(f"\nCosmos DB: {config.COSMOS_ENDPOINT}")
 
-    # Step 1: Load chunks from Cosmos DB
-    print("\n[Step 1/4] Loading chunks from Cosmos DB...")
-    chunks = azure_cosmos.load_chunks()
-    print(f"✓ Loaded {len(chunks)} chunks with contextual headers")
+    embeddings = None
+    high_water = None
+    if resume:
+        if not (RESUME_EMBEDDINGS_PATH.exists() and RESUME_CHUNKS_PATH.exists()):
+            print("❌ No saved embeddings to resume from. Run without --resume first.")
+            sys.exit(1)
+        # Step 1: Load chunks + embeddings saved by the previous run
+        print("\n[Step 1/4] Resuming from saved chunks and embeddings...")
+        chunks, embeddings = load_upload_artifacts()
+        print(f"✓ Loaded {len(chunks)} chunks and {len(embeddings)} embeddings from {config.CACHE_DIR}")
+    elif incremental:
+        # Step 1: Load only chunks written since the last recorded run
+        since = load_high_water_mark()
+        print(f"\n[Step 1/4] Loading chunks changed since _ts={since} from Cosmos DB...")
+        chunks, high_water = azure_cosmos.load_chunks_since(since)
+        print(f"✓ Loaded {len(chunks)} changed chunks")
+        if not chunks:
+            print("✓ Index is up to date; nothing to upload")
+            return
+    else:
+        # Step 1: Load chunks from Cosmos DB
+        print("\n[Step 1/4] Loading chunks from Cosmos DB...")
+        chunks, high_water = azure_cosmos.load_chunks_since(0)
+        print(f"✓ Loaded {len(chunks)} chunks with contextual headers")
 
     if not chunks:
         print("❌ No chunks found in Cosmos DB. Run migrate_to_cosmos.py first.")
@@ -51,7 +120,7 @@ def create_search_index():
     # Step 2: Create Azure Search index schema
     print("\n[Step 2/4] Creating Azure Search index...")
     try:
-        azure_search.create_search_index(embedding_dimensions=3072)
+        azure_search.create_search_index(embedding_dimensions=config.EMBED_DIM_FALLBACK)
         print(f"✓ Index '{config.AZURE_SEARCH_INDEX_NAME}' created/verified")
     except Exception as e:
         print(f"❌ Failed to create index: {e}")
@@ -61,48 +130,45 @@ def create_search_index():
         print("  • If quota error: Check Azure Search service tier")
         sys.exit(1)
 
-    # Step 3: Generate embeddings
-    print("\n[Step 3/4] Generating embeddings for all chunks...")
-    print(f"  Processing {len(chunks)} chunks in batches of {config.EMBED_BATCH_SIZE}")
-    print(f"  Delay between batches: {config.EMBED_DELAY_SECONDS}s")
-    print("  ⏳ This will take approximately 5-10 minutes...")
-
-    # Use augmented_chunk (includes contextual header)
-    texts = [chunk.augmented_chunk for chunk in chunks]
-
-    # Generate embeddings in batches
-    all_embeddings = []
-    total_batches = (len(texts) + config.EMBED_BATCH_SIZE - 1) // config.EMBED_BATCH_SIZE
-
-    for i in range(0, len(texts), config.EMBED_BATCH_SIZE):
-        batch_texts = texts[i:i + config.EMBED_BATCH_SIZE]
-        batch_num = i // config.EMBED_BATCH_SIZE + 1
-
-        print(f"  [Batch {batch_num}/{total_batches}] Processing {len(batch_texts)} chunks...")
-
+    # Steps 3+4: Generate embeddings and upload to Azure Search
+    if embeddings is not None:
+        print("\n[Step 3/4] Skipping embeddings (resumed from saved run)")
+        print("\n[Step 4/4] Uploading chunks with embeddings to Azure Search...")
         try:
-            batch_embeddings = get_embeddings_batch(batch_texts)
-            all_embeddings.extend(batch_embeddings)
-
-            # Rate limiting delay
-            if i + config.EMBED_BATCH_SIZE < len(texts):
-                time.sleep(config.EMBED_DELAY_SECONDS)
-
+            azure_search.upload_chunks(chunks, embeddings)
+            print(f"✓ Uploaded {len(chunks)} chunks to Azure Search")
         except Exception as e:
-            print(f"❌ Failed to generate embeddings for batch {batch_num}: {e}")
+            print(f"❌ Failed to upload to Azure Search: {e}")
+            print("  Embeddings are saved; retry the upload with: python3 create_azure_search_index.py --resume")
             sys.exit(1)
+    else:
+        print("\n[Steps 3-4/4] Generating embeddings and uploading as slices finish...")
+        print(f"  Processing {len(chunks)} chunks in batches of {config.EMBED_BATCH_SIZE}")
+        print("  Pacing from Azure OpenAI rate-limit headers (no fixed delay)")
 
-    embeddings = np.array(all_embeddings, dtype=np.float32)
-    print(f"✓ Generated {len(embeddings)} embeddings ({embeddings.shape[1]} dimensions)")
+        # Embeds augmented_chunk (includes contextual header); uploads overlap embedding
+        try:
+            embeddings = asyncio.run(azure_search.aembed_and_upload(chunks))
+        except azure_search.UploadError as e:
+            print(f"❌ {len(e.failed_ids)} chunks failed to upload: {', '.join(e.failed_ids)}")
+            if e.embeddings is not None:
+                save_upload_artifacts(chunks, e.embeddings)
+                print(f"  Saved embeddings to {RESUME_EMBEDDINGS_PATH.name}; retry just the upload with:")
+                print("  python3 create_azure_search_index.py --resume")
+            print("  High-water mark not advanced; rerun (or --incremental) to retry them")
+            sys.exit(1)
+        except Exception as e:
+            print(f"❌ Failed to embed/upload chunks: {e}")
+            print("  Finished embeddings are in the embedding cache; rerunning will not re-embed them")
+            sys.exit(1)
 
-    # Step 4: Upload to Azure Search
-    print("\n[Step 4/4] Uploading chunks with embeddings to Azure Search...")
-    try:
-        azure_search.upload_chunks(chunks, embeddings, batch_size=100)
+        print(f"✓ Generated {len(embeddings)} embeddings ({embeddings.shape[1]} dimensions)")
         print(f"✓ Uploaded {len(chunks)} chunks to Azure Search")
-    except Exception as e:
-        print(f"❌ Failed to upload to Azure Search: {e}")
-        sys.exit(1)
+
+        save_upload_artifacts(chunks, embeddings)
+        print(f"  Saved embeddings to {RESUME_EMBEDDINGS_PATH.name} (redo just the upload with --resume)")
+        save_high_water_mark(high_water)
+        print(f"  Recorded high-water mark _ts={high_water} (next time: --incremental)")
 
     # Verify
     print("\n[Verification] Checking Azure Search index...")
@@ -111,6 +177,9 @@ def create_search_index():
         print(f"✓ Azure Search index contains {doc_count} documents")
     except Exception as e:
         print(f"⚠️  Could not verify document count: {e}")
+    warmed = azure_search.warm_up(embeddings)
+    if warmed:
+        print(f"✓ Warmed the index with {warmed} queries")
 
     # Final summary
     print("\n" + "=" * 70)
@@ -127,8 +196,22 @@ def create_search_index():
     print("=" * 70)
 
 def main():
+    parser = argparse.ArgumentParser(description="Create Azure Search index from Cosmos DB chunks")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse chunks/embeddings saved by a previous run and only redo the upload",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only embed and upload chunks written to Cosmos DB since the last successful run",
+    )
+    args = parser.parse_args()
+    if args.resume and args.incremental:
+        parser.error("--resume and --incremental cannot be combined")
     try:
-        create_search_index()
+        create_search_index(resume=args.resume, incremental=args.incremental)
     except KeyboardInterrupt:
         print("\n\n⚠️  Index creation interrupted by user")
         sys.exit(1)
@@ -63,32 +63,15 @@ async def migrate():
     print("\n[Step 4/5] Creating Azure AI Search index...")
     print("  ⏳ Generating embeddings and uploading to Azure Search...")
     print(f"  Processing {len(chunks)} chunks in batches of {config.EMBED_BATCH_SIZE}")
-    print(f"  Delay between batches: {config.EMBED_DELAY_SECONDS}s")
+    print(f"  {config.EMBED_CONCURRENCY} batches in flight, up to {config.EMBED_REQUESTS_PER_MIN} requests/min")
 
-    # Prepare texts and metadata
+    # Prepare texts; metadata rows are taken from the chunks themselves
     # Use augmented_chunk (which includes the contextual header)
     texts = [chunk.augmented_chunk for chunk in chunks]
-    metadata = [
-        {
-            "chunk_id": chunk.chunk_id,
-            "doc_id": chunk.doc_id,
-            "doc_title": chunk.doc_title,
-            "raw_chunk": chunk.raw_chunk,
-            "ctx_header": chunk.ctx_header,
-            "augmented_chunk": chunk.augmented_chunk,
-            "section_path": chunk.section_path,
-            "source_org": chunk.source_org,
-            "source_url": chunk.source_url,
-            "pub_date": chunk.pub_date,
-            "chunk_index": chunk.chunk_index,
-        }
-        for chunk in chunks
-    ]
 
     # Build index (this generates embeddings and uploads to Azure Search)
     index, meta, embeddings = cache.build_or_load_index(
         texts=texts,
-        metadata=metadata,
         chunks=chunks,
         force=True  # Force rebuild for initial migration
     )
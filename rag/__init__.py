@@ -5,4 +5,5 @@ __all__ = [
     "embeddings",
     "index",
     "retrieval",
+    "rerank",
 ]
@@ -6,8 +6,14 @@ This module provides functions to:
 3. Query and manage stored data
 """
 from __future__ import annotations
+import functools
+import hashlib
+import json
 import logging
-from typing import List, Optional, Dict, Any
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from azure.cosmos import CosmosClient, PartitionKey, exceptions
 from azure.cosmos.container import ContainerProxy
@@ -16,11 +22,42 @@ from azure.cosmos.database import DatabaseProxy
 from . import config
 from .models import Document, Chunk
 
+try:  # optional: C-speed serialization for content hashes
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+# Items per page when streaming query results (SDK follows continuation tokens)
+QUERY_PAGE_SIZE = 1000
+
+# Partition key for newly created chunk containers (existing containers keep theirs;
+# see copy_chunks for moving data into a /doc_id container)
+CHUNK_PARTITION_KEY = "/doc_id"
+
+# Chunk properties read back from Cosmos; projecting them skips system metadata (_rid, _etag, ...)
+_CHUNK_FIELDS = (
+    "chunk_id", "doc_id", "doc_title", "raw_chunk", "chunk_index", "ctx_header",
+    "augmented_chunk", "section_path", "source_org", "source_url", "pub_date",
+)
+_CHUNK_SELECT = "SELECT " + ", ".join(f"c.{f}" for f in _CHUNK_FIELDS) + " FROM c"
+# Same projection plus the Cosmos last-modified timestamp, filtered on a high-water mark
+_CHUNK_SELECT_SINCE = (
+    "SELECT " + ", ".join(f"c.{f}" for f in _CHUNK_FIELDS) + ", c._ts FROM c WHERE c._ts >= @since"
+)
+
+# Ids per lookup when reading stored content hashes before a save
+_HASH_LOOKUP_BATCH = 500
+
+# Operations per transactional batch (Cosmos DB limit)
+_BATCH_MAX_OPERATIONS = 100
+_BATCH_MAX_BYTES = 1_500_000  # headroom under the 2 MB transactional batch limit
 
+
+@functools.lru_cache(maxsize=1)
 def _get_cosmos_client() -> CosmosClient:
-    """Get Cosmos DB client."""
+    """Get the process-wide Cosmos DB client (thread-safe, keeps its connection pool)."""
     if not config.COSMOS_ENDPOINT or not config.COSMOS_KEY:
         raise RuntimeError(
             "Cosmos DB not configured. Set COSMOS_ENDPOINT and COSMOS_KEY"
@@ -32,8 +69,9 @@ def _get_cosmos_client() -> CosmosClient:
     )
 
 
+@functools.lru_cache(maxsize=1)
 def _get_database() -> DatabaseProxy:
-    """Get or create the Cosmos DB database."""
+    """Get or create the Cosmos DB database (checked once per process)."""
     client = _get_cosmos_client()
 
     try:
@@ -45,11 +83,25 @@ def _get_database() -> DatabaseProxy:
         raise
 
 
-def _get_container(container_name: str) -> ContainerProxy:
+def _partition_key_path(container_name: str) -> str:
+    """Partition key used when creating ``container_name``.
+
+    Chunks are partitioned on ``/doc_id`` so a document's chunks share one
+    logical partition; everything else is partitioned on ``/id``.
+    """
+    return CHUNK_PARTITION_KEY if container_name == config.COSMOS_CONTAINER_CHUNKS else "/id"
+
+
+@functools.lru_cache(maxsize=8)
+def _get_container(container_name: str, partition_key_path: Optional[str] = None) -> ContainerProxy:
     """Get or create a Cosmos DB container.
 
+    Memoized per name, so the create-if-not-exists round-trips happen only on
+    the first call for each container.
+
     Args:
         container_name: Name of the container to get/create
+        partition_key_path: Partition key for a new container (default from `_partition_key_path`)
 
     Returns:
         ContainerProxy for the requested container
@@ -57,11 +109,10 @@ def _get_container(container_name: str) -> ContainerProxy:
     database = _get_database()
 
     try:
-        # Create container with partition key on 'id' for simple partitioning
         # Note: offer_throughput is not set for serverless accounts
         container = database.create_container_if_not_exists(
             id=container_name,
-            partition_key=PartitionKey(path="/id")
+            partition_key=PartitionKey(path=partition_key_path or _partition_key_path(container_name))
         )
         logger.info(f"Using container: {container_name}")
         return container
@@ -70,17 +121,243 @@ def _get_container(container_name: str) -> ContainerProxy:
         raise
 
 
+@functools.lru_cache(maxsize=8)
+def _get_container_fast(container_name: str) -> ContainerProxy:
+    """Get a proxy for an existing container without any service round-trip.
+
+    Used by the read paths; the containers are created by `init_cosmos_db` or
+    by the first save, which go through `_get_container`.
+    """
+    return _get_cosmos_client().get_database_client(config.COSMOS_DB_NAME).get_container_client(container_name)
+
+
+@functools.lru_cache(maxsize=8)
+def _is_partitioned_by_doc(container_name: str) -> bool:
+    """True if the existing container's partition key is ``/doc_id`` (read once per process)."""
+    properties = _get_container_fast(container_name).read()
+    return properties.get("partitionKey", {}).get("paths") == ["/doc_id"]
+
+
 def init_cosmos_db() -> None:
-    """Initialize Cosmos DB database and containers."""
+    """Initialize Cosmos DB database and containers.
+
+    The database is created first; the two containers only depend on it, so
+    their create-if-not-exists round-trips run concurrently.
+    """
     logger.info("Initializing Cosmos DB...")
 
-    # Create database and containers
-    _get_container(config.COSMOS_CONTAINER_DOCUMENTS)
-    _get_container(config.COSMOS_CONTAINER_CHUNKS)
+    # Create database, then both containers
+    _get_database()
+    names = [config.COSMOS_CONTAINER_DOCUMENTS, config.COSMOS_CONTAINER_CHUNKS]
+    with ThreadPoolExecutor(max_workers=len(names)) as executor:
+        list(executor.map(_get_container, names))
 
     logger.info("Cosmos DB initialized successfully")
 
 
+def _canonical_json(payload: Dict[str, Any]) -> bytes:
+    """Compact, key-sorted UTF-8 JSON; orjson and the stdlib fallback produce identical bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _content_hash(item: Dict[str, Any]) -> str:
+    payload = {k: v for k, v in item.items() if k != "content_hash"}
+    return hashlib.sha256(_canonical_json(payload)).hexdigest()
+
+
+def _stored_hashes(container: ContainerProxy, ids: List[str]) -> Dict[str, str]:
+    """Return ``{id: content_hash}`` for the given ids that already exist in ``container``."""
+    stored: Dict[str, str] = {}
+    for i in range(0, len(ids), _HASH_LOOKUP_BATCH):
+        rows = container.query_items(
+            query="SELECT c.id, c.content_hash FROM c WHERE ARRAY_CONTAINS(@ids, c.id)",
+            parameters=[{"name": "@ids", "value": ids[i:i + _HASH_LOOKUP_BATCH]}],
+            enable_cross_partition_query=True,
+        )
+        for row in rows:
+            if row.get("content_hash"):
+                stored[row["id"]] = row["content_hash"]
+    return stored
+
+
+def _throttle_delay(error: exceptions.CosmosHttpResponseError, attempt: int) -> float:
+    """Seconds to wait after a 429: the service's retry-after if sent, else 1.5^attempt, plus jitter."""
+    headers = getattr(error, "headers", None) or {}
+    try:
+        delay = float(headers.get("x-ms-retry-after-ms", 0)) / 1000.0
+    except ValueError:
+        delay = 0.0
+    delay = delay or 1.5 ** attempt
+    return min(delay + random.uniform(0, delay / 2), 30.0)
+
+
+def _with_backoff(write: Callable[[], Any], what: str) -> Any:
+    """Run one write, backing off on 429s the SDK's own throttle retries gave up on.
+
+    Concurrent writers exhaust the client's built-in retries together when the
+    container runs out of RU/s; waiting here (up to COSMOS_THROTTLE_RETRIES
+    times) lets the burst drain instead of failing the save.
+    """
+    for attempt in range(config.COSMOS_THROTTLE_RETRIES + 1):
+        try:
+            return write()
+        except exceptions.CosmosHttpResponseError as e:
+            if e.status_code != 429 or attempt == config.COSMOS_THROTTLE_RETRIES:
+                raise
+            delay = _throttle_delay(e, attempt)
+            logger.warning(f"Throttled writing {what} (attempt {attempt + 1}), waiting {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _item_bytes(item: Dict[str, Any]) -> int:
+    """Approximate serialized size of an item: its string values dominate."""
+    return sum(len(v.encode("utf-8")) + 8 for v in item.values() if isinstance(v, str)) + 64
+
+
+def _upsert_batches(
+    items: List[Dict[str, Any]], partition_field: str
+) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+    """Group items by partition key value into transactional batches.
+
+    Each batch holds at most 100 operations and about _BATCH_MAX_BYTES of
+    items (the service rejects batch payloads over 2 MB).
+    """
+    groups: Dict[Any, List[Dict[str, Any]]] = {}
+    for item in items:
+        groups.setdefault(item[partition_field], []).append(item)
+
+    batches: List[Tuple[Any, List[Dict[str, Any]]]] = []
+    for pk, group in groups.items():
+        batch: List[Dict[str, Any]] = []
+        size = 0
+        for item in group:
+            item_size = _item_bytes(item)
+            if batch and (len(batch) >= _BATCH_MAX_OPERATIONS or size + item_size > _BATCH_MAX_BYTES):
+                batches.append((pk, batch))
+                batch, size = [], 0
+            batch.append(item)
+            size += item_size
+        if batch:
+            batches.append((pk, batch))
+    return batches
+
+
+def _write_batch(container: ContainerProxy, pk: Any, batch: List[Dict[str, Any]]) -> None:
+    """Upsert one partition's batch: a point write for a single item, else one transactional batch."""
+    if len(batch) == 1:
+        _with_backoff(lambda: container.upsert_item(batch[0]), batch[0]["id"])
+        return
+    _with_backoff(
+        lambda: container.execute_item_batch(
+            batch_operations=[("upsert", (item,)) for item in batch], partition_key=pk
+        ),
+        f"{len(batch)} items in partition {pk}",
+    )
+
+
+def _chunk_partition_field(container_name: str) -> str:
+    """Item field holding a chunks container's partition key value."""
+    return "doc_id" if _is_partitioned_by_doc(container_name) else "id"
+
+
+def _upsert_items(
+    container: ContainerProxy, items: List[Dict[str, Any]], kind: str, partition_field: str = "id"
+) -> None:
+    """Upsert the changed ``items`` concurrently through one container proxy.
+
+    Each item carries a ``content_hash`` of its other fields. Items whose hash
+    matches the stored copy are skipped, so re-saving an unchanged corpus costs
+    one projection query per batch of ids instead of a write per item.
+
+    Items sharing a ``partition_field`` value (a document's chunks in a
+    ``/doc_id`` container) are written as transactional batches of up to 100
+    operations, one round-trip per batch; in an ``/id`` container every item
+    is its own partition, so each is a point upsert. Batches run in parallel
+    over the client's pooled connections. The first failure is logged and
+    re-raised once all submitted writes have finished.
+    """
+    for item in items:
+        item["content_hash"] = _content_hash(item)
+    stored = _stored_hashes(container, [item["id"] for item in items])
+    changed = [item for item in items if stored.get(item["id"]) != item["content_hash"]]
+    if len(changed) < len(items):
+        logger.info(f"Skipping {len(items) - len(changed)} unchanged {kind}s")
+    items = changed
+
+    with ThreadPoolExecutor(max_workers=max(1, config.COSMOS_WRITE_CONCURRENCY)) as executor:
+        futures = {
+            executor.submit(_write_batch, container, pk, batch): (pk, len(batch))
+            for pk, batch in _upsert_batches(items, partition_field)
+        }
+        first_error: Optional[Exception] = None
+        for future in as_completed(futures):
+            pk, size = futures[future]
+            try:
+                future.result()
+            except (exceptions.CosmosHttpResponseError, exceptions.CosmosBatchOperationError) as e:
+                logger.error(f"Failed to save {size} {kind}s in partition {pk}: {e}")
+                first_error = first_error or e
+    if first_error is not None:
+        raise first_error
+
+
+def _delete_items(
+    container: ContainerProxy,
+    partition_field: str,
+    where: str = "",
+    parameters: Optional[List[Dict[str, Any]]] = None,
+    kind: str = "item",
+    **scope: Any,
+) -> int:
+    """Delete the items matching ``where`` and return how many were removed.
+
+    Only ``id`` and the partition key are projected, so no item bodies are
+    transferred. Ids are grouped by partition key value and each group is
+    deleted with transactional batches of up to 100 operations; groups run in
+    parallel. The first failure is logged and re-raised once all batches finish.
+    """
+    fields = "c.id" if partition_field == "id" else f"c.id, c.{partition_field}"
+    rows = container.query_items(
+        query=f"SELECT {fields} FROM c{where}",
+        parameters=parameters,
+        max_item_count=QUERY_PAGE_SIZE,
+        **(scope or {"enable_cross_partition_query": True}),
+    )
+    ids_by_pk: Dict[Any, List[str]] = {}
+    for row in rows:
+        ids_by_pk.setdefault(row[partition_field], []).append(row["id"])
+
+    batches = [
+        (pk, ids[i:i + _BATCH_MAX_OPERATIONS])
+        for pk, ids in ids_by_pk.items()
+        for i in range(0, len(ids), _BATCH_MAX_OPERATIONS)
+    ]
+    deleted = 0
+    with ThreadPoolExecutor(max_workers=max(1, config.COSMOS_WRITE_CONCURRENCY)) as executor:
+        futures = {
+            executor.submit(
+                container.execute_item_batch,
+                batch_operations=[("delete", (item_id,)) for item_id in group],
+                partition_key=pk,
+            ): (pk, len(group))
+            for pk, group in batches
+        }
+        first_error: Optional[exceptions.CosmosHttpResponseError] = None
+        for future in as_completed(futures):
+            pk, size = futures[future]
+            try:
+                future.result()
+                deleted += size
+            except exceptions.CosmosHttpResponseError as e:
+                logger.error(f"Failed to delete {size} {kind}s in partition {pk}: {e}")
+                first_error = first_error or e
+    if first_error is not None:
+        raise first_error
+    return deleted
+
+
 def save_documents(documents: List[Document]) -> None:
     """Save documents to Cosmos DB.
 
@@ -95,9 +372,9 @@ def save_documents(documents: List[Document]) -> None:
 
     container = _get_container(config.COSMOS_CONTAINER_DOCUMENTS)
 
-    for doc in documents:
-        # Convert Document to dict for Cosmos DB
-        doc_dict = {
+    # Convert Documents to dicts for Cosmos DB
+    items = [
+        {
             "id": doc.doc_id,  # Cosmos DB requires 'id' field
             "doc_id": doc.doc_id,
             "title": doc.title,
@@ -106,17 +383,44 @@ def save_documents(documents: List[Document]) -> None:
             "source_org": doc.source_org,
             "pub_date": doc.pub_date,
         }
-
-        try:
-            # Upsert (create or update) the document
-            container.upsert_item(doc_dict)
-        except exceptions.CosmosHttpResponseError as e:
-            logger.error(f"Failed to save document {doc.doc_id}: {e}")
-            raise
+        for doc in documents
+    ]
+    _upsert_items(container, items, "document")
 
     logger.info(f"Successfully saved {len(documents)} documents")
 
 
+def _document_from_item(item: Dict[str, Any]) -> Document:
+    """Convert a Cosmos DB item into a Document."""
+    return Document(
+        doc_id=item["doc_id"],
+        title=item.get("title", ""),
+        content=item.get("content", ""),
+        source_url=item.get("source_url", ""),
+        source_org=item.get("source_org", ""),
+        pub_date=item.get("pub_date", ""),
+    )
+
+
+def iter_documents(page_size: int = QUERY_PAGE_SIZE) -> Iterator[Document]:
+    """Stream all documents from Cosmos DB one page at a time.
+
+    Args:
+        page_size: Maximum items returned per request
+
+    Yields:
+        Document objects
+    """
+    container = _get_container_fast(config.COSMOS_CONTAINER_DOCUMENTS)
+
+    try:
+        for item in container.read_all_items(max_item_count=page_size):
+            yield _document_from_item(item)
+    except exceptions.CosmosHttpResponseError as e:
+        logger.error(f"Failed to load documents: {e}")
+        raise
+
+
 def load_documents() -> List[Document]:
     """Load all documents from Cosmos DB.
 
@@ -125,31 +429,10 @@ def load_documents() -> List[Document]:
     """
     logger.info("Loading documents from Cosmos DB")
 
-    container = _get_container(config.COSMOS_CONTAINER_DOCUMENTS)
+    documents = list(iter_documents())
 
-    try:
-        # Query all documents
-        items = list(container.read_all_items())
-
-        # Convert to Document objects
-        documents = [
-            Document(
-                doc_id=item["doc_id"],
-                title=item.get("title", ""),
-                content=item.get("content", ""),
-                source_url=item.get("source_url", ""),
-                source_org=item.get("source_org", ""),
-                pub_date=item.get("pub_date", ""),
-            )
-            for item in items
-        ]
-
-        logger.info(f"Loaded {len(documents)} documents")
-        return documents
-
-    except exceptions.CosmosHttpResponseError as e:
-        logger.error(f"Failed to load documents: {e}")
-        raise
+    logger.info(f"Loaded {len(documents)} documents")
+    return documents
 
 
 def save_chunks(chunks: List[Chunk]) -> None:
@@ -166,33 +449,58 @@ def save_chunks(chunks: List[Chunk]) -> None:
 
     container = _get_container(config.COSMOS_CONTAINER_CHUNKS)
 
-    for chunk in chunks:
-        # Convert Chunk to dict for Cosmos DB
-        chunk_dict = {
-            "id": chunk.chunk_id,  # Cosmos DB requires 'id' field
-            "chunk_id": chunk.chunk_id,
-            "doc_id": chunk.doc_id,
-            "doc_title": chunk.doc_title,
-            "raw_chunk": chunk.raw_chunk,
-            "chunk_index": chunk.chunk_index,
-            "ctx_header": chunk.ctx_header,
-            "augmented_chunk": chunk.augmented_chunk,
-            "section_path": chunk.section_path,
-            "source_org": chunk.source_org,
-            "source_url": chunk.source_url,
-            "pub_date": chunk.pub_date,
-        }
-
-        try:
-            # Upsert (create or update) the chunk
-            container.upsert_item(chunk_dict)
-        except exceptions.CosmosHttpResponseError as e:
-            logger.error(f"Failed to save chunk {chunk.chunk_id}: {e}")
-            raise
+    # Chunk's fields are exactly the item's fields, so each item is one C-level
+    # copy of the instance dict plus the 'id' Cosmos DB requires
+    items = [dict(vars(chunk), id=chunk.chunk_id) for chunk in chunks]
+    _upsert_items(container, items, "chunk", _chunk_partition_field(config.COSMOS_CONTAINER_CHUNKS))
 
     logger.info(f"Successfully saved {len(chunks)} chunks")
 
 
+def _chunk_from_item(item: Dict[str, Any]) -> Chunk:
+    """Convert a Cosmos DB item into a Chunk."""
+    return Chunk(
+        chunk_id=item["chunk_id"],
+        doc_id=item.get("doc_id", ""),
+        doc_title=item.get("doc_title", ""),
+        raw_chunk=item.get("raw_chunk", ""),
+        chunk_index=item.get("chunk_index", 0),
+        ctx_header=item.get("ctx_header", ""),
+        augmented_chunk=item.get("augmented_chunk", ""),
+        section_path=item.get("section_path", ""),
+        source_org=item.get("source_org", ""),
+        source_url=item.get("source_url", ""),
+        pub_date=item.get("pub_date", ""),
+    )
+
+
+def iter_chunks(page_size: int = QUERY_PAGE_SIZE) -> Iterator[Chunk]:
+    """Stream all chunks from Cosmos DB one page at a time.
+
+    The query pager requests ``page_size`` items per round-trip and follows the
+    continuation token, so only the current page is buffered in memory.
+
+    Args:
+        page_size: Maximum items returned per request
+
+    Yields:
+        Chunk objects
+    """
+    container = _get_container_fast(config.COSMOS_CONTAINER_CHUNKS)
+
+    try:
+        items = container.query_items(
+            query=_CHUNK_SELECT,
+            enable_cross_partition_query=True,
+            max_item_count=page_size,
+        )
+        for item in items:
+            yield _chunk_from_item(item)
+    except exceptions.CosmosHttpResponseError as e:
+        logger.error(f"Failed to load chunks: {e}")
+        raise
+
+
 def load_chunks() -> List[Chunk]:
     """Load all chunks from Cosmos DB.
 
@@ -201,37 +509,48 @@ def load_chunks() -> List[Chunk]:
     """
     logger.info("Loading chunks from Cosmos DB")
 
-    container = _get_container(config.COSMOS_CONTAINER_CHUNKS)
+    chunks = list(iter_chunks())
 
-    try:
-        # Query all chunks
-        items = list(container.read_all_items())
-
-        # Convert to Chunk objects
-        chunks = [
-            Chunk(
-                chunk_id=item["chunk_id"],
-                doc_id=item.get("doc_id", ""),
-                doc_title=item.get("doc_title", ""),
-                raw_chunk=item.get("raw_chunk", ""),
-                chunk_index=item.get("chunk_index", 0),
-                ctx_header=item.get("ctx_header", ""),
-                augmented_chunk=item.get("augmented_chunk", ""),
-                section_path=item.get("section_path", ""),
-                source_org=item.get("source_org", ""),
-                source_url=item.get("source_url", ""),
-                pub_date=item.get("pub_date", ""),
-            )
-            for item in items
-        ]
-
-        logger.info(f"Loaded {len(chunks)} chunks")
-        return chunks
+    logger.info(f"Loaded {len(chunks)} chunks")
+    return chunks
+
+
+def load_chunks_since(since_ts: int, page_size: int = QUERY_PAGE_SIZE) -> Tuple[List[Chunk], int]:
+    """Load chunks written at or after a high-water mark.
 
+    ``_ts`` (epoch seconds, set by Cosmos on every write) only has one-second
+    resolution, so the comparison is inclusive: a chunk written in the same
+    second as the previous run's newest one is returned again rather than
+    missed. Deleted chunks are not reported.
+
+    Args:
+        since_ts: ``_ts`` returned by the previous call (0 loads everything)
+        page_size: Maximum items returned per request
+
+    Returns:
+        Tuple of (changed chunks, newest ``_ts`` seen or ``since_ts`` if none)
+    """
+    container = _get_container_fast(config.COSMOS_CONTAINER_CHUNKS)
+    chunks: List[Chunk] = []
+    high_water = since_ts
+
+    try:
+        items = container.query_items(
+            query=_CHUNK_SELECT_SINCE,
+            parameters=[{"name": "@since", "value": since_ts}],
+            enable_cross_partition_query=True,
+            max_item_count=page_size,
+        )
+        for item in items:
+            high_water = max(high_water, item.pop("_ts"))
+            chunks.append(_chunk_from_item(item))
     except exceptions.CosmosHttpResponseError as e:
-        logger.error(f"Failed to load chunks: {e}")
+        logger.error(f"Failed to load changed chunks: {e}")
         raise
 
+    logger.info(f"Loaded {len(chunks)} chunks changed since _ts={since_ts}")
+    return chunks, high_water
+
 
 def get_document_by_id(doc_id: str) -> Optional[Document]:
     """Get a specific document by ID.
@@ -242,18 +561,11 @@ def get_document_by_id(doc_id: str) -> Optional[Document]:
     Returns:
         Document object or None if not found
     """
-    container = _get_container(config.COSMOS_CONTAINER_DOCUMENTS)
+    container = _get_container_fast(config.COSMOS_CONTAINER_DOCUMENTS)
 
     try:
         item = container.read_item(item=doc_id, partition_key=doc_id)
-        return Document(
-            doc_id=item["doc_id"],
-            title=item.get("title", ""),
-            content=item.get("content", ""),
-            source_url=item.get("source_url", ""),
-            source_org=item.get("source_org", ""),
-            pub_date=item.get("pub_date", ""),
-        )
+        return _document_from_item(item)
     except exceptions.CosmosResourceNotFoundError:
         logger.warning(f"Document {doc_id} not found")
         return None
@@ -271,33 +583,24 @@ def get_chunks_by_doc_id(doc_id: str) -> List[Chunk]:
     Returns:
         List of Chunk objects for the document
     """
-    container = _get_container(config.COSMOS_CONTAINER_CHUNKS)
+    container = _get_container_fast(config.COSMOS_CONTAINER_CHUNKS)
 
     try:
         # Query chunks by doc_id
-        query = "SELECT * FROM c WHERE c.doc_id = @doc_id"
+        query = f"{_CHUNK_SELECT} WHERE c.doc_id = @doc_id"
+        if _is_partitioned_by_doc(config.COSMOS_CONTAINER_CHUNKS):
+            # Single-partition query: only this document's chunks are read
+            scope: Dict[str, Any] = {"partition_key": doc_id}
+        else:
+            # Legacy /id-partitioned container: fan out across partitions
+            scope = {"enable_cross_partition_query": True}
         items = list(container.query_items(
             query=query,
             parameters=[{"name": "@doc_id", "value": doc_id}],
-            enable_cross_partition_query=True
+            **scope
         ))
 
-        chunks = [
-            Chunk(
-                chunk_id=item["chunk_id"],
-                doc_id=item.get("doc_id", ""),
-                doc_title=item.get("doc_title", ""),
-                raw_chunk=item.get("raw_chunk", ""),
-                chunk_index=item.get("chunk_index", 0),
-                ctx_header=item.get("ctx_header", ""),
-                augmented_chunk=item.get("augmented_chunk", ""),
-                section_path=item.get("section_path", ""),
-                source_org=item.get("source_org", ""),
-                source_url=item.get("source_url", ""),
-                pub_date=item.get("pub_date", ""),
-            )
-            for item in items
-        ]
+        chunks = [_chunk_from_item(item) for item in items]
 
         return chunks
 
@@ -306,28 +609,105 @@ def get_chunks_by_doc_id(doc_id: str) -> List[Chunk]:
         raise
 
 
+def delete_chunks_by_doc_id(doc_id: str) -> int:
+    """Delete all chunks for a specific document (e.g. before re-chunking it).
+
+    Args:
+        doc_id: Document ID whose chunks should be removed
+
+    Returns:
+        Number of chunks deleted
+    """
+    container = _get_container_fast(config.COSMOS_CONTAINER_CHUNKS)
+    where = " WHERE c.doc_id = @doc_id"
+    parameters = [{"name": "@doc_id", "value": doc_id}]
+    if _is_partitioned_by_doc(config.COSMOS_CONTAINER_CHUNKS):
+        # Every chunk sits in the doc_id partition: one scoped query, full 100-op batches
+        count = _delete_items(container, "doc_id", where, parameters, "chunk", partition_key=doc_id)
+    else:
+        count = _delete_items(container, "id", where, parameters, "chunk")
+    logger.info(f"Deleted {count} chunks for document {doc_id}")
+    return count
+
+
+def copy_chunks(source_container: str, target_container: str) -> int:
+    """Copy every chunk from ``source_container`` into ``target_container``.
+
+    One-time backfill for moving an ``/id``-partitioned chunks container onto
+    the ``/doc_id`` layout; the target is created with that partition key if it
+    does not exist. Point COSMOS_CONTAINER_CHUNKS at the target afterwards.
+
+    Returns:
+        Number of chunks copied
+    """
+    source = _get_container_fast(source_container)
+    target = _get_container(target_container, CHUNK_PARTITION_KEY)
+
+    partition_field = _chunk_partition_field(target_container)
+    copied = 0
+    batch: List[Dict[str, Any]] = []
+    for item in source.query_items(
+        query="SELECT * FROM c", enable_cross_partition_query=True, max_item_count=QUERY_PAGE_SIZE
+    ):
+        batch.append({k: v for k, v in item.items() if not k.startswith("_")})
+        if len(batch) >= QUERY_PAGE_SIZE:
+            _upsert_items(target, batch, "chunk", partition_field)
+            copied += len(batch)
+            batch = []
+    if batch:
+        _upsert_items(target, batch, "chunk", partition_field)
+        copied += len(batch)
+
+    logger.info(f"Copied {copied} chunks from {source_container} to {target_container}")
+    return copied
+
+
+def _recreate_container(container_name: str) -> int:
+    """Drop and recreate a container, returning how many items it held.
+
+    A full wipe as one control-plane delete costs no per-item RUs, unlike
+    deleting every item individually.
+    """
+    try:
+        count = _count_items(_get_container_fast(container_name))
+    except exceptions.CosmosResourceNotFoundError:
+        count = 0
+    try:
+        _get_database().delete_container(container_name)
+    except exceptions.CosmosResourceNotFoundError:
+        pass
+    # Drop every memoized proxy of the deleted container before recreating
+    _get_container.cache_clear()
+    _get_container_fast.cache_clear()
+    _is_partitioned_by_doc.cache_clear()
+    _get_container(container_name)
+    return count
+
+
 def delete_all_documents() -> None:
     """Delete all documents from Cosmos DB (use with caution)."""
     logger.warning("Deleting all documents from Cosmos DB")
-    container = _get_container(config.COSMOS_CONTAINER_DOCUMENTS)
-
-    items = list(container.read_all_items())
-    for item in items:
-        container.delete_item(item=item["id"], partition_key=item["id"])
-
-    logger.info(f"Deleted {len(items)} documents")
+    count = _recreate_container(config.COSMOS_CONTAINER_DOCUMENTS)
+    logger.info(f"Deleted {count} documents")
 
 
 def delete_all_chunks() -> None:
     """Delete all chunks from Cosmos DB (use with caution)."""
     logger.warning("Deleting all chunks from Cosmos DB")
-    container = _get_container(config.COSMOS_CONTAINER_CHUNKS)
+    count = _recreate_container(config.COSMOS_CONTAINER_CHUNKS)
+    logger.info(f"Deleted {count} chunks")
 
-    items = list(container.read_all_items())
-    for item in items:
-        container.delete_item(item=item["id"], partition_key=item["id"])
 
-    logger.info(f"Deleted {len(items)} chunks")
+def _count_items(container: ContainerProxy) -> int:
+    """Count items server-side.
+
+    ``max_item_count`` is a page size, not a limit, so listing items to count
+    them pulls the whole container over the wire; COUNT(1) returns one number.
+    """
+    return next(iter(container.query_items(
+        query="SELECT VALUE COUNT(1) FROM c",
+        enable_cross_partition_query=True,
+    )), 0)
 
 
 def get_stats() -> Dict[str, Any]:
@@ -336,11 +716,11 @@ def get_stats() -> Dict[str, Any]:
     Returns:
         Dictionary with document and chunk counts
     """
-    doc_container = _get_container(config.COSMOS_CONTAINER_DOCUMENTS)
-    chunk_container = _get_container(config.COSMOS_CONTAINER_CHUNKS)
+    doc_container = _get_container_fast(config.COSMOS_CONTAINER_DOCUMENTS)
+    chunk_container = _get_container_fast(config.COSMOS_CONTAINER_CHUNKS)
 
-    doc_count = len(list(doc_container.read_all_items(max_item_count=1)))
-    chunk_count = len(list(chunk_container.read_all_items(max_item_count=1)))
+    doc_count = _count_items(doc_container)
+    chunk_count = _count_items(chunk_container)
 
     return {
         "document_count": doc_count,
@@ -355,10 +735,15 @@ __all__ = [
     "init_cosmos_db",
     "save_documents",
     "load_documents",
+    "iter_documents",
     "save_chunks",
     "load_chunks",
+    "load_chunks_since",
+    "iter_chunks",
     "get_document_by_id",
     "get_chunks_by_doc_id",
+    "delete_chunks_by_doc_id",
+    "copy_chunks",
     "delete_all_documents",
     "delete_all_chunks",
     "get_stats",
@@ -2,16 +2,31 @@
 
 This module provides functions to:
 1. Create and configure Azure AI Search index with vector search
-2. Upload document chunks with embeddings to the index
+2. Upload document chunks with embeddings to the index (optionally while
+   they are still being embedded)
 3. Perform vector similarity search
 """
 from __future__ import annotations
+import asyncio
+import gzip
+import hashlib
+import itertools
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from azure.core.credentials import AzureKeyCredential
-from azure.search.documents import SearchClient
+from azure.core.pipeline.policies import SansIOHTTPPolicy
+from azure.core.pipeline.transport import RequestsTransport
+from azure.core.rest import HttpRequest
+from azure.search.documents import SearchClient, SearchIndexingBufferedSender
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
     SearchIndex,
@@ -21,6 +36,9 @@ from azure.search.documents.indexes.models import (
     HnswAlgorithmConfiguration,
     HnswParameters,
     VectorSearchProfile,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
+    RescoringOptions,
     SemanticConfiguration,
     SemanticPrioritizedFields,
     SemanticField,
@@ -28,148 +46,273 @@ from azure.search.documents.indexes.models import (
 )
 from azure.search.documents.models import VectorizedQuery, VectorizableTextQuery
 
-from . import config
+from . import config, embed_cache
 from .models import Chunk, RetrievalResult
+from .embeddings import aembed_texts
 
 logger = logging.getLogger(__name__)
 
+_index_client: Optional[SearchIndexClient] = None
+_search_client: Optional[SearchClient] = None
+_credential: Optional[AzureKeyCredential] = None
+_session: Optional[requests.Session] = None
+_client_lock = threading.Lock()  # upload workers build senders concurrently
+
+# search_cached: (vector digest, top_k, filters) -> (stored at, results), oldest first
+_result_cache: "OrderedDict[tuple, Tuple[float, List[RetrievalResult]]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+# Azure AI Search accepts at most 1000 actions and 16 MB per indexing request
+_MAX_BATCH_ACTIONS = 1000
+_MAX_BATCH_BYTES = 12 * 1024 * 1024  # headroom under the 16 MB cap
+_JSON_BYTES_PER_FLOAT = 20
+_JSON_BYTES_PER_HALF = 9  # rounded to _HALF_DECIMALS before upload
+_EST_TEXT_BYTES_PER_DOC = 8 * 1024
+
+# Vector element types for the embedding field (SEARCH_VECTOR_TYPE)
+_VECTOR_TYPES = {"single": SearchFieldDataType.Single, "half": SearchFieldDataType.Half}
+_HALF_DECIMALS = 5
+
+# Fields returned with full search results, and the slim set for search_ids.
+# augmented_chunk is not retrievable: it is always ctx_header + "\n\n" + raw_chunk,
+# so `_result_metadata` rebuilds it from those two instead.
+_RESULT_FIELDS = (
+    "chunk_id", "doc_id", "doc_title", "raw_chunk",
+    "ctx_header", "section_path",
+    "source_org", "source_url", "pub_date", "chunk_index",
+)
+_RESULT_SELECT = list(_RESULT_FIELDS)
+_RESULT_DEFAULTS = {f: 0 if f == "chunk_index" else "" for f in _RESULT_FIELDS}
+_ID_SELECT = ["chunk_id", "doc_id"]
 
-def _get_search_client() -> SearchClient:
-    """Get Azure Search client for querying."""
-    if not config.AZURE_SEARCH_ENDPOINT or not config.AZURE_SEARCH_KEY:
-        raise RuntimeError(
-            "Azure Search not configured. Set AZURE_SEARCH_ENDPOINT and AZURE_SEARCH_KEY"
+# HNSW parameter ranges accepted by Azure AI Search
+_HNSW_NAME = "medical-context-hnsw"
+_HNSW_RANGES = {"m": (4, 10), "ef_construction": (100, 1000), "ef_search": (100, 1000)}
+
+
+def _hnsw_settings(**overrides: Optional[int]) -> Dict[str, int]:
+    """HNSW_M / HNSW_EFC / HNSW_EFS (or non-None ``overrides``), checked against the ranges the service accepts."""
+    settings = {"m": config.HNSW_M, "ef_construction": config.HNSW_EFC, "ef_search": config.HNSW_EFS}
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    for name, value in settings.items():
+        low, high = _HNSW_RANGES[name]
+        if not low <= value <= high:
+            raise ValueError(f"HNSW {name} must be between {low} and {high}, got {value}")
+    return settings
+
+
+def _index_hnsw_settings(index: SearchIndex) -> Optional[Dict[str, int]]:
+    """HNSW parameters an existing index was created with (None if it has no such algorithm)."""
+    algorithms = index.vector_search.algorithms if index.vector_search else None
+    for algorithm in algorithms or []:
+        if algorithm.name == _HNSW_NAME and algorithm.parameters:
+            p = algorithm.parameters
+            return {"m": p.m, "ef_construction": p.ef_construction, "ef_search": p.ef_search}
+    return None
+
+
+def _index_compressed(index: SearchIndex) -> bool:
+    """Whether an existing index's vector profile stores quantized (compressed) vectors."""
+    profiles = index.vector_search.profiles if index.vector_search else None
+    return any(p.compression_name for p in profiles or [])
+
+
+def _index_dimensions(index: SearchIndex) -> Optional[int]:
+    """Width of an existing index's embedding field (None if it has none)."""
+    for field in index.fields or []:
+        if field.name == "embedding":
+            return field.vector_search_dimensions
+    return None
+
+
+def _vector_type() -> str:
+    if config.SEARCH_VECTOR_TYPE not in _VECTOR_TYPES:
+        raise ValueError(
+            f"SEARCH_VECTOR_TYPE must be one of {sorted(_VECTOR_TYPES)}, got {config.SEARCH_VECTOR_TYPE!r}"
         )
+    return config.SEARCH_VECTOR_TYPE
 
-    credential = AzureKeyCredential(config.AZURE_SEARCH_KEY)
-    return SearchClient(
-        endpoint=config.AZURE_SEARCH_ENDPOINT,
-        index_name=config.AZURE_SEARCH_INDEX_NAME,
-        credential=credential
-    )
+
+def _auto_batch_size(embedding_dim: int) -> int:
+    """Largest upload batch that stays under the request size limit for this vector width."""
+    bytes_per_float = _JSON_BYTES_PER_HALF if _vector_type() == "half" else _JSON_BYTES_PER_FLOAT
+    per_doc = embedding_dim * bytes_per_float + _EST_TEXT_BYTES_PER_DOC
+    return max(1, min(_MAX_BATCH_ACTIONS, _MAX_BATCH_BYTES // per_doc))
+
+
+def _get_credential() -> AzureKeyCredential:
+    """Get the shared admin-key credential, checking configuration on first use."""
+    global _credential
+    if _credential is None:
+        if not config.AZURE_SEARCH_ENDPOINT or not config.AZURE_SEARCH_KEY:
+            raise RuntimeError(
+                "Azure Search not configured. Set AZURE_SEARCH_ENDPOINT and AZURE_SEARCH_KEY"
+            )
+        _credential = AzureKeyCredential(config.AZURE_SEARCH_KEY)
+    return _credential
+
+
+def _get_transport() -> RequestsTransport:
+    """Get a transport over the process-wide pooled ``requests`` session.
+
+    Every client (query, index management, upload senders) sends through the
+    same connection pool, sized for SEARCH_UPLOAD_CONCURRENCY parallel
+    requests. ``session_owner=False`` keeps the pool open when a client is
+    closed, e.g. when a buffered sender's ``with`` block ends. Retries are left
+    to the SDK pipeline, as with the SDK's own session.
+    """
+    global _session
+    with _client_lock:
+        if _session is None:
+            pool_size = max(10, config.SEARCH_UPLOAD_CONCURRENCY * 2)
+            adapter = HTTPAdapter(
+                pool_maxsize=pool_size,
+                max_retries=Retry(total=False, redirect=False, raise_on_status=False),
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return RequestsTransport(session=_session, session_owner=False)
+
+
+def _get_search_client() -> SearchClient:
+    """Get the shared Azure Search client for querying.
+
+    Built once per process; SearchClient is thread-safe, so searches and
+    counts from any thread reuse its pipeline and open connections.
+    """
+    global _search_client
+    if _search_client is not None:
+        return _search_client
+
+    credential = _get_credential()
+    transport = _get_transport()
+    with _client_lock:
+        if _search_client is None:
+            _search_client = SearchClient(
+                endpoint=config.AZURE_SEARCH_ENDPOINT,
+                index_name=config.AZURE_SEARCH_INDEX_NAME,
+                credential=credential,
+                transport=transport,
+            )
+    return _search_client
 
 
 def _get_index_client() -> SearchIndexClient:
-    """Get Azure Search index client for management operations."""
-    if not config.AZURE_SEARCH_ENDPOINT or not config.AZURE_SEARCH_KEY:
-        raise RuntimeError(
-            "Azure Search not configured. Set AZURE_SEARCH_ENDPOINT and AZURE_SEARCH_KEY"
-        )
+    """Get the shared Azure Search index client for management operations.
 
-    credential = AzureKeyCredential(config.AZURE_SEARCH_KEY)
-    return SearchIndexClient(
+    Built once per process so repeated get/create/delete/stats calls reuse one
+    HTTP pipeline and its open connection.
+    """
+    global _index_client
+    if _index_client is not None:
+        return _index_client
+
+    _index_client = SearchIndexClient(
         endpoint=config.AZURE_SEARCH_ENDPOINT,
-        credential=credential
+        credential=_get_credential(),
+        transport=_get_transport(),
     )
+    return _index_client
 
 
-def create_search_index(embedding_dimensions: int = 3072, force_recreate: bool = False) -> None:
-    """Create or update Azure AI Search index with vector search capabilities.
+def _field(name: str, type: str, **attributes: bool) -> SearchField:
+    """A non-vector field with filterable/sortable/facetable off unless asked for.
 
-    Args:
-        embedding_dimensions: Dimension of embedding vectors (default: 3072 for text-embedding-3-large)
-        force_recreate: If True, delete existing index before creating new one
+    The service turns all three on when they are omitted, building a sorted
+    set or facet dictionary per field that no query here reads.
     """
-    index_client = _get_index_client()
-
-    # Check if index exists
-    try:
-        existing_index = index_client.get_index(config.AZURE_SEARCH_INDEX_NAME)
-        if existing_index and not force_recreate:
-            logger.info(f"Index {config.AZURE_SEARCH_INDEX_NAME} already exists, skipping creation")
-            return
-        elif existing_index and force_recreate:
-            logger.info(f"Deleting existing index: {config.AZURE_SEARCH_INDEX_NAME}")
-            index_client.delete_index(config.AZURE_SEARCH_INDEX_NAME)
-    except Exception:
-        # Index doesn't exist, we'll create it
-        pass
-
-    logger.info(f"Creating Azure AI Search index: {config.AZURE_SEARCH_INDEX_NAME}")
+    for attribute in ("filterable", "sortable", "facetable"):
+        attributes.setdefault(attribute, False)
+    return SearchField(name=name, type=type, **attributes)
+
+
+def build_index_definition(
+    name: str = config.AZURE_SEARCH_INDEX_NAME,
+    embedding_dimensions: int = config.EMBED_DIM_FALLBACK,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    compress: Optional[bool] = None,
+) -> SearchIndex:
+    """The index schema: chunk fields, HNSW vector search and semantic config.
+
+    Every tuning knob defaults to its config value (HNSW_M / HNSW_EFC /
+    HNSW_EFS / SEARCH_VECTOR_COMPRESSION), so `create_search_index` builds the
+    configured index while sweeps (``sweep_azure_hnsw.py``) build variants
+    without touching the environment.
 
-    # Define the fields for the index
+    Args:
+        name: Index name
+        embedding_dimensions: Width of the embedding field
+        m, ef_construction, ef_search: HNSW parameters (checked against Azure's ranges)
+        compress: int8 scalar quantization with rescoring
+    """
+    hnsw = _hnsw_settings(m=m, ef_construction=ef_construction, ef_search=ef_search)
+    if compress is None:
+        compress = config.SEARCH_VECTOR_COMPRESSION
+
+    # Define the fields for the index. Nothing is sortable or facetable (no
+    # query orders or facets results) and only fields a filter uses are
+    # filterable: chunk_id for the search.in lookup, doc_id / source_org /
+    # pub_date for callers' filters.
     fields = [
-        SearchField(
-            name="chunk_id",
-            type=SearchFieldDataType.String,
-            key=True,
-            sortable=True,
-            filterable=True,
-        ),
-        SearchField(
-            name="doc_id",
-            type=SearchFieldDataType.String,
-            filterable=True,
-            sortable=True,
-        ),
-        SearchField(
-            name="doc_title",
-            type=SearchFieldDataType.String,
-            searchable=True,
-            filterable=True,
-        ),
-        SearchField(
-            name="raw_chunk",
-            type=SearchFieldDataType.String,
-            searchable=True,
-        ),
-        SearchField(
-            name="ctx_header",
-            type=SearchFieldDataType.String,
-            searchable=True,
-        ),
-        SearchField(
-            name="augmented_chunk",
-            type=SearchFieldDataType.String,
-            searchable=True,
-        ),
-        SearchField(
-            name="section_path",
-            type=SearchFieldDataType.String,
-            searchable=True,
-            filterable=True,
-        ),
-        SearchField(
-            name="source_org",
-            type=SearchFieldDataType.String,
-            filterable=True,
-        ),
-        SearchField(
-            name="source_url",
-            type=SearchFieldDataType.String,
-            filterable=True,
-        ),
-        SearchField(
-            name="pub_date",
-            type=SearchFieldDataType.String,
-            filterable=True,
-            sortable=True,
-        ),
-        SearchField(
-            name="chunk_index",
-            type=SearchFieldDataType.Int32,
-            filterable=True,
-            sortable=True,
-        ),
-        # Vector field for embeddings
+        _field("chunk_id", SearchFieldDataType.String, key=True, filterable=True),
+        _field("doc_id", SearchFieldDataType.String, filterable=True),
+        _field("doc_title", SearchFieldDataType.String, searchable=True),
+        _field("raw_chunk", SearchFieldDataType.String, searchable=True),
+        _field("ctx_header", SearchFieldDataType.String, searchable=True),
+        # Header + text as embedded; searchable for BM25/semantic ranking, but
+        # not returned (hidden): _result_metadata rebuilds it from the two
+        # retrievable fields
+        _field("augmented_chunk", SearchFieldDataType.String, searchable=True, hidden=True),
+        _field("section_path", SearchFieldDataType.String, searchable=True),
+        _field("source_org", SearchFieldDataType.String, filterable=True),
+        _field("source_url", SearchFieldDataType.String),
+        _field("pub_date", SearchFieldDataType.String, filterable=True),
+        _field("chunk_index", SearchFieldDataType.Int32),
+        # Vector field for embeddings. Vectors are never returned in results
+        # (the local cache keeps them), so the retrievable copy is not stored;
+        # the HNSW graph and rescoring originals are unaffected.
         SearchField(
             name="embedding",
-            type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+            type=SearchFieldDataType.Collection(_VECTOR_TYPES[_vector_type()]),
             searchable=True,
+            hidden=True,
+            stored=False,
             vector_search_dimensions=embedding_dimensions,
             vector_search_profile_name="medical-context-vector-profile",
         ),
     ]
 
+    # Optional int8 scalar quantization: float32 vectors are still uploaded,
+    # Azure stores a quantized copy for the HNSW graph and rescores the
+    # oversampled candidates against the originals.
+    compressions = []
+    compression_name = None
+    if compress:
+        compression_name = "medical-context-scalar-q"
+        compressions.append(
+            ScalarQuantizationCompression(
+                compression_name=compression_name,
+                parameters=ScalarQuantizationParameters(quantized_data_type="int8"),
+                rescoring_options=RescoringOptions(
+                    enable_rescoring=True,
+                    default_oversampling=config.SEARCH_VECTOR_OVERSAMPLING,
+                ),
+            )
+        )
+
     # Configure vector search with HNSW algorithm (similar to FAISS)
     vector_search = VectorSearch(
         algorithms=[
             HnswAlgorithmConfiguration(
-                name="medical-context-hnsw",
+                name=_HNSW_NAME,
                 parameters=HnswParameters(
-                    m=4,  # Number of bi-directional links (similar to FAISS IVF)
-                    ef_construction=400,  # Size of dynamic candidate list for construction
-                    ef_search=500,  # Size of dynamic candidate list for search
+                    m=hnsw["m"],  # Number of bi-directional links per node
+                    ef_construction=hnsw["ef_construction"],  # Size of dynamic candidate list for construction
+                    ef_search=hnsw["ef_search"],  # Size of dynamic candidate list for search
                     metric="cosine",  # Use cosine similarity (similar to normalized L2)
                 )
             )
@@ -177,9 +320,11 @@ def create_search_index(embedding_dimensions: int = 3072, force_recreate: bool =
         profiles=[
             VectorSearchProfile(
                 name="medical-context-vector-profile",
-                algorithm_configuration_name="medical-context-hnsw",
+                algorithm_configuration_name=_HNSW_NAME,
+                compression_name=compression_name,
             )
-        ]
+        ],
+        compressions=compressions or None,
     )
 
     # Configure semantic search for better ranking
@@ -197,81 +342,372 @@ def create_search_index(embedding_dimensions: int = 3072, force_recreate: bool =
 
     semantic_search = SemanticSearch(configurations=[semantic_config])
 
-    # Create the index
-    index = SearchIndex(
-        name=config.AZURE_SEARCH_INDEX_NAME,
+    return SearchIndex(
+        name=name,
         fields=fields,
         vector_search=vector_search,
         semantic_search=semantic_search,
     )
 
+
+def create_search_index(embedding_dimensions: int = config.EMBED_DIM_FALLBACK, force_recreate: bool = False) -> None:
+    """Create or update Azure AI Search index with vector search capabilities.
+
+    Args:
+        embedding_dimensions: Dimension of embedding vectors (default: EMBED_DIM_FALLBACK,
+            3072 for text-embedding-3-large unless EMBED_DIMENSIONS truncates it)
+        force_recreate: If True, delete existing index before creating new one
+    """
+    index_client = _get_index_client()
+    hnsw = _hnsw_settings()
+
+    # Check if index exists
+    try:
+        existing_index = index_client.get_index(config.AZURE_SEARCH_INDEX_NAME)
+    except Exception:
+        # Index doesn't exist, we'll create it
+        existing_index = None
+
+    # HNSW parameters and vector compression are fixed at creation; an empty
+    # index built with other values costs nothing to rebuild, a populated one
+    # is left for the caller.
+    if existing_index and not force_recreate:
+        stale = []
+        if _index_hnsw_settings(existing_index) not in (None, hnsw):
+            stale.append(f"HNSW {_index_hnsw_settings(existing_index)} (config has {hnsw})")
+        if _index_dimensions(existing_index) not in (None, embedding_dimensions):
+            stale.append(f"{_index_dimensions(existing_index)}-dim vectors (requested {embedding_dimensions})")
+        if _index_compressed(existing_index) != config.SEARCH_VECTOR_COMPRESSION:
+            stale.append(
+                f"vector compression {'on' if _index_compressed(existing_index) else 'off'} "
+                f"(SEARCH_VECTOR_COMPRESSION={int(config.SEARCH_VECTOR_COMPRESSION)})"
+            )
+        if stale and get_document_count() == 0:
+            logger.info(f"Index {config.AZURE_SEARCH_INDEX_NAME} is empty and has stale settings, recreating")
+            force_recreate = True
+        elif stale:
+            logger.warning(
+                f"Index {config.AZURE_SEARCH_INDEX_NAME} was built with {'; '.join(stale)}; "
+                f"use force_recreate=True to rebuild it"
+            )
+
+    if existing_index and not force_recreate:
+        logger.info(f"Index {config.AZURE_SEARCH_INDEX_NAME} already exists, skipping creation")
+        return
+    elif existing_index and force_recreate:
+        logger.info(f"Deleting existing index: {config.AZURE_SEARCH_INDEX_NAME}")
+        index_client.delete_index(config.AZURE_SEARCH_INDEX_NAME)
+
+    logger.info(f"Creating Azure AI Search index: {config.AZURE_SEARCH_INDEX_NAME}")
+    index = build_index_definition(embedding_dimensions=embedding_dimensions)
+
     result = index_client.create_or_update_index(index)
     logger.info(f"Index created/updated: {result.name}")
 
 
+class _GzipBodyPolicy(SansIOHTTPPolicy):
+    """Gzip request bodies of at least ``min_bytes`` (level 1: vector JSON shrinks ~2-3x at little CPU).
+
+    Runs once per call, ahead of the retry policy, so retries resend the
+    already-compressed body.
+    """
+
+    def __init__(self, min_bytes: int = 1024):
+        self.min_bytes = min_bytes
+
+    def on_request(self, request) -> None:
+        http_request = request.http_request
+        body = http_request.content
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if not isinstance(body, bytes) or len(body) < self.min_bytes:
+            return
+        headers = {k: v for k, v in http_request.headers.items() if k.lower() != "content-length"}
+        headers["Content-Encoding"] = "gzip"
+        request.http_request = HttpRequest(
+            http_request.method, http_request.url, headers=headers,
+            content=gzip.compress(body, compresslevel=1),
+        )
+
+
+def _get_buffered_sender(**kwargs: Any) -> SearchIndexingBufferedSender:
+    """Get a buffered sender for bulk indexing.
+
+    The sender batches queued actions, splits a request in half when Azure
+    rejects it as too large, and re-queues documents that fail with a
+    retryable status (409/422/503) before reporting them through ``on_error``.
+    With SEARCH_UPLOAD_GZIP the batch bodies are sent gzip-compressed.
+    """
+    if config.SEARCH_UPLOAD_GZIP:
+        kwargs.setdefault("per_call_policies", [_GzipBodyPolicy()])
+    return SearchIndexingBufferedSender(
+        endpoint=config.AZURE_SEARCH_ENDPOINT,
+        index_name=config.AZURE_SEARCH_INDEX_NAME,
+        credential=_get_credential(),
+        transport=_get_transport(),
+        auto_flush_interval=config.SEARCH_AUTO_FLUSH_INTERVAL,
+        **kwargs
+    )
+
+
+def _vector_lists(embeddings: np.ndarray) -> List[List[float]]:
+    """Convert embedding rows to JSON-ready lists in one C pass over the block."""
+    if _vector_type() == "half":
+        # Edm.Half keeps ~3 significant digits; extra decimals would only inflate the JSON body
+        return np.round(embeddings.astype(np.float16).astype(np.float64), _HALF_DECIMALS).tolist()
+    return embeddings.tolist()
+
+
+def _doc_iter(chunks: List[Chunk], embeddings: np.ndarray, block: int) -> Iterator[Dict[str, Any]]:
+    """Yield search documents one at a time, converting vectors ``block`` rows at a time.
+
+    Chunk's fields are exactly the index's text fields, so each document is a
+    shallow copy of the instance dict plus its vector.
+    """
+    for i in range(0, len(chunks), block):
+        for chunk, vector in zip(chunks[i:i + block], _vector_lists(embeddings[i:i + block])):
+            yield dict(vars(chunk), embedding=vector)
+
+
+class UploadError(RuntimeError):
+    """Documents the service still rejected after the buffered sender's retries.
+
+    Raised once every other document has been sent. ``failed_ids`` are the
+    rejected chunk ids; `aembed_and_upload` also attaches the ``embeddings``
+    it computed, so a caller can save them and retry just the upload.
+    """
+
+    def __init__(self, failed_ids: List[str], embeddings: Optional[np.ndarray] = None):
+        preview = ", ".join(failed_ids[:10]) + (", ..." if len(failed_ids) > 10 else "")
+        super().__init__(f"{len(failed_ids)} documents failed to upload: {preview}")
+        self.failed_ids = failed_ids
+        self.embeddings = embeddings
+
+
+def _send_documents(
+    shard: int, chunks: List[Chunk], embeddings: np.ndarray, batch_size: int
+) -> Tuple[int, List[str]]:
+    """Index one shard of chunks through one buffered sender. Returns (succeeded, failed ids).
+
+    The sender sends everything it holds in a single request once its buffer
+    reaches ``initial_batch_action_count``, so documents are drawn from
+    `_doc_iter` and queued ``batch_size`` at a time: only about one batch of
+    documents exists as Python objects at once, and leaving the ``with``
+    block flushes the remainder.
+    """
+    succeeded = 0
+    failed: List[str] = []
+
+    def on_progress(action) -> None:
+        nonlocal succeeded
+        succeeded += 1
+
+    def on_error(action) -> None:
+        failed.append(action.get("chunk_id"))
+        logger.error(f"Failed to upload {action.get('chunk_id')}")
+
+    with _get_buffered_sender(
+        initial_batch_action_count=batch_size, on_progress=on_progress, on_error=on_error
+    ) as sender:
+        documents = _doc_iter(chunks, embeddings, batch_size)
+        while batch := list(itertools.islice(documents, batch_size)):
+            sender.upload_documents(documents=batch)
+
+    logger.info(f"Shard {shard}: {succeeded} succeeded, {len(failed)} failed")
+    return succeeded, failed
+
+
 def upload_chunks(
     chunks: List[Chunk],
     embeddings: np.ndarray,
-    batch_size: int = 100
+    batch_size: Optional[int] = None,
+    max_workers: int = config.SEARCH_UPLOAD_CONCURRENCY,
 ) -> None:
     """Upload chunks with embeddings to Azure AI Search.
 
+    The chunks are split into ``max_workers`` contiguous shards, each
+    indexed by its own `SearchIndexingBufferedSender`, so several batches are
+    in flight at once. Throttling (429/503) is retried by the SDK's retry
+    policy, which honours ``Retry-After``, so no fixed pause is needed between
+    batches; per-document failures are retried by the sender, and any still
+    failing raise `UploadError` once the other documents are sent.
+    Vectors stay in the float32 matrix until their batch is sent, so peak
+    memory follows ``batch_size * max_workers`` rather than the corpus size.
+
     Args:
         chunks: List of Chunk objects to upload
         embeddings: NumPy array of embeddings (shape: [n_chunks, embedding_dim])
-        batch_size: Number of documents to upload per batch
+        batch_size: Number of documents per batch. Defaults to SEARCH_UPLOAD_BATCH_SIZE,
+            or when that is 0, the largest batch that fits the 16 MB request limit
+            for this embedding width (~180 docs at 3072 dims)
+        max_workers: Number of senders (and so batches) in flight at once
+
+    Raises:
+        UploadError: If any document was rejected
     """
     if len(chunks) != embeddings.shape[0]:
         raise ValueError(
             f"Mismatch: {len(chunks)} chunks but {embeddings.shape[0]} embeddings"
         )
+    if not chunks:
+        return
 
-    logger.info(f"Uploading {len(chunks)} chunks to Azure AI Search")
+    if not batch_size:
+        batch_size = config.SEARCH_UPLOAD_BATCH_SIZE or _auto_batch_size(embeddings.shape[1])
+
+    logger.info(f"Uploading {len(chunks)} chunks to Azure AI Search in batches of {batch_size}")
+
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    # One sender per shard; .result() re-raises any error a worker hit
+    shard_size = -(-len(chunks) // max(1, max_workers))
+    failed_ids: List[str] = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(
+                _send_documents, i // shard_size + 1,
+                chunks[i:i + shard_size], embeddings[i:i + shard_size], batch_size,
+            )
+            for i in range(0, len(chunks), shard_size)
+        ]
+        for future in as_completed(futures):
+            _, failed = future.result()
+            failed_ids.extend(failed)
+
+    if failed_ids:
+        raise UploadError(failed_ids)
 
-    search_client = _get_search_client()
 
-    # Convert chunks and embeddings to search documents
-    documents = []
-    for i, chunk in enumerate(chunks):
-        doc = {
-            "chunk_id": chunk.chunk_id,
-            "doc_id": chunk.doc_id,
-            "doc_title": chunk.doc_title,
-            "raw_chunk": chunk.raw_chunk,
-            "ctx_header": chunk.ctx_header,
-            "augmented_chunk": chunk.augmented_chunk,
-            "section_path": chunk.section_path,
-            "source_org": chunk.source_org,
-            "source_url": chunk.source_url,
-            "pub_date": chunk.pub_date,
-            "chunk_index": chunk.chunk_index,
-            "embedding": embeddings[i].tolist(),  # Convert numpy array to list
-        }
-        documents.append(doc)
-
-    # Upload in batches
-    for i in range(0, len(documents), batch_size):
-        batch = documents[i:i + batch_size]
-        result = search_client.upload_documents(documents=batch)
-
-        # Check for errors
-        succeeded = sum(1 for r in result if r.succeeded)
-        failed = len(result) - succeeded
-
-        logger.info(
-            f"Batch {i // batch_size + 1}: {succeeded} succeeded, {failed} failed"
+async def aembed_and_upload(
+    chunks: List[Chunk],
+    slice_size: Optional[int] = None,
+    queue_size: int = 4,
+    keep_embeddings: bool = True,
+) -> Optional[np.ndarray]:
+    """Embed ``augmented_chunk`` texts and upload them, overlapping the two stages.
+
+    A producer embeds ``slice_size`` chunks at a time and hands each finished
+    slice to a consumer that runs `upload_chunks` in a worker thread, so
+    uploads of slice *n* proceed while slice *n+1* is being embedded. The
+    bounded queue applies backpressure when uploads fall behind.
+
+    Args:
+        chunks: Chunk objects to embed and index
+        slice_size: Chunks embedded per slice. Defaults to enough batches to
+            keep every EMBED_CONCURRENCY slot busy several times over
+        queue_size: Embedded slices allowed to wait for upload
+        keep_embeddings: If False, each slice's vectors are dropped once
+            uploaded, so peak memory is a few slices rather than the corpus
+
+    Returns:
+        The full ``(len(chunks), dim)`` float32 embedding matrix, or None when
+        ``keep_embeddings`` is False
+
+    Raises:
+        UploadError: After every slice is sent, if any document was rejected
+            or any slice's request failed; carries the failed ids of all
+            slices and the embedding matrix
+    """
+    if not chunks:
+        return np.zeros((0, config.EMBED_DIM_FALLBACK), dtype=np.float32)
+    slice_size = slice_size or config.EMBED_BATCH_SIZE * max(1, config.EMBED_CONCURRENCY) * 4
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+    embeddings: Optional[np.ndarray] = None
+
+    async def produce() -> None:
+        nonlocal embeddings
+        try:
+            for start in range(0, len(chunks), slice_size):
+                part = chunks[start:start + slice_size]
+                vecs = await aembed_texts([c.augmented_chunk for c in part])
+                if keep_embeddings and embeddings is None:
+                    embeddings = np.empty((len(chunks), vecs.shape[1]), dtype=np.float32)
+                if keep_embeddings:
+                    embeddings[start:start + len(part)] = vecs
+                await queue.put((part, vecs))
+        finally:
+            await queue.put(None)
+
+    failed_ids: List[str] = []
+
+    async def consume() -> None:
+        while (item := await queue.get()) is not None:
+            try:
+                await asyncio.to_thread(upload_chunks, *item)
+            except UploadError as e:
+                failed_ids.extend(e.failed_ids)
+            except Exception as e:
+                # A request that failed outright (after the SDK's retries) fails
+                # its whole slice; later slices are still sent
+                logger.error(f"Failed to upload a slice of {len(item[0])} chunks: {e}")
+                failed_ids.extend(c.chunk_id for c in item[0])
+
+    await asyncio.gather(produce(), consume())
+    if failed_ids:
+        raise UploadError(failed_ids, embeddings)
+    return embeddings
+
+
+def _result_metadata(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Result fields of one hit, with ``augmented_chunk`` rebuilt as `rag.headers` joins it."""
+    metadata = {f: result.get(f, d) for f, d in _RESULT_DEFAULTS.items()}
+    metadata["augmented_chunk"] = f"{metadata['ctx_header']}\n\n{metadata['raw_chunk']}"
+    return metadata
+
+
+def _to_retrieval_results(results) -> List[RetrievalResult]:
+    """Convert search hits to RetrievalResults (rank order, stored chunk_index as chunk_id).
+
+    ``chunk_index`` is the integer that ends each ``<doc_id>_chunk_<n>`` key,
+    already indexed as Int32, so no key is parsed per hit.
+    """
+    retrieval_results = []
+    for rank, result in enumerate(results, start=1):
+        metadata = _result_metadata(result)
+        retrieval_results.append(
+            RetrievalResult(
+                rank=rank,
+                similarity=result.get("@search.score", 0.0),  # Azure Search similarity score
+                chunk_id=metadata["chunk_index"],
+                metadata=metadata,
+            )
         )
+    return retrieval_results
+
 
-        if failed > 0:
-            for r in result:
-                if not r.succeeded:
-                    logger.error(f"Failed to upload {r.key}: {r.error_message}")
+def _vector_query(
+    query_embedding: np.ndarray,
+    top_k: int,
+    exhaustive: bool = False,
+    oversampling: Optional[float] = None,
+) -> VectorizedQuery:
+    """Vector query over the embedding field with the per-query search overrides.
+
+    The service has no per-query efSearch (HNSW_EFS is fixed in the index
+    definition); the knobs a query can turn are ``exhaustive`` (exact kNN over
+    every vector, for recall-critical queries and for measuring the recall of
+    the HNSW settings) and ``oversampling`` (compressed candidates rescored
+    per result, overriding SEARCH_VECTOR_OVERSAMPLING; needs
+    SEARCH_VECTOR_COMPRESSION).
+    """
+    if oversampling is not None and not config.SEARCH_VECTOR_COMPRESSION:
+        raise ValueError("oversampling needs SEARCH_VECTOR_COMPRESSION=1")
+    return VectorizedQuery(
+        vector=np.ravel(query_embedding).tolist(),
+        k_nearest_neighbors=top_k,
+        fields="embedding",
+        exhaustive=exhaustive or None,
+        oversampling=oversampling,
+    )
 
 
 def search(
     query_embedding: np.ndarray,
     top_k: int = 5,
-    filters: Optional[str] = None
+    filters: Optional[str] = None,
+    exhaustive: bool = False,
+    oversampling: Optional[float] = None,
 ) -> List[RetrievalResult]:
     """Perform vector similarity search in Azure AI Search.
 
@@ -279,6 +715,8 @@ def search(
         query_embedding: Query embedding vector (shape: [embedding_dim])
         top_k: Number of top results to return
         filters: OData filter expression (e.g., "source_org eq 'WHO'")
+        exhaustive: Exact kNN over all vectors instead of the HNSW graph
+        oversampling: Per-query override of SEARCH_VECTOR_OVERSAMPLING
 
     Returns:
         List of RetrievalResult objects with similarity scores
@@ -290,58 +728,156 @@ def search(
         query_embedding = query_embedding.flatten()
 
     # Create vector query
-    vector_query = VectorizedQuery(
-        vector=query_embedding.tolist(),
-        k_nearest_neighbors=top_k,
-        fields="embedding"
-    )
+    vector_query = _vector_query(query_embedding, top_k, exhaustive, oversampling)
 
     # Perform vector search
     results = search_client.search(
         search_text=None,  # Pure vector search (no keyword search)
+        vector_queries=[vector_query],  # k bounds the result count, so no separate top
+        filter=filters,
+        select=_RESULT_SELECT,
+    )
+
+    retrieval_results = _to_retrieval_results(results)
+    logger.info(f"Found {len(retrieval_results)} results")
+    return retrieval_results
+
+
+def search_cached(
+    query_embedding: np.ndarray,
+    top_k: int = 5,
+    filters: Optional[str] = None,
+    exhaustive: bool = False,
+    oversampling: Optional[float] = None,
+) -> List[RetrievalResult]:
+    """`search` behind an in-process LRU cache with a time-to-live.
+
+    Repeated queries (same vector, ``top_k``, filter and overrides) within
+    SEARCH_CACHE_TTL seconds are answered from memory instead of a service
+    round-trip; at most SEARCH_CACHE_SIZE result lists are kept. Results can
+    lag index updates by up to the TTL.
+    """
+    if config.SEARCH_CACHE_SIZE <= 0:
+        return search(query_embedding, top_k=top_k, filters=filters,
+                      exhaustive=exhaustive, oversampling=oversampling)
+
+    vector = np.ascontiguousarray(np.ravel(query_embedding), dtype=np.float32)
+    key = (hashlib.blake2b(vector.tobytes(), digest_size=16).digest(), top_k, filters, exhaustive, oversampling)
+    now = time.monotonic()
+    with _result_cache_lock:
+        hit = _result_cache.get(key)
+        if hit is not None and now - hit[0] < config.SEARCH_CACHE_TTL:
+            _result_cache.move_to_end(key)
+            return list(hit[1])
+
+    results = search(vector, top_k=top_k, filters=filters, exhaustive=exhaustive, oversampling=oversampling)
+    with _result_cache_lock:
+        _result_cache[key] = (now, results)
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > config.SEARCH_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return list(results)
+
+
+def search_ids(
+    query_embedding: np.ndarray,
+    top_k: int = 5,
+    filters: Optional[str] = None,
+    exhaustive: bool = False,
+    oversampling: Optional[float] = None,
+) -> List[Tuple[str, str, float]]:
+    """Vector search returning only ``(chunk_id, doc_id, score)`` per hit.
+
+    Skips the chunk text fields, which make up most of a full response, for
+    callers that rerank or dedupe first and fetch bodies for the survivors
+    with `hydrate`.
+
+    Args:
+        query_embedding: Query embedding vector (shape: [embedding_dim])
+        top_k: Number of nearest neighbours to return
+        filters: OData filter expression (e.g., "source_org eq 'WHO'")
+        exhaustive: Exact kNN over all vectors instead of the HNSW graph
+        oversampling: Per-query override of SEARCH_VECTOR_OVERSAMPLING
+    """
+    vector_query = _vector_query(query_embedding, top_k, exhaustive, oversampling)
+    results = _get_search_client().search(
+        search_text=None,
         vector_queries=[vector_query],
         filter=filters,
-        select=[
-            "chunk_id", "doc_id", "doc_title", "raw_chunk",
-            "ctx_header", "augmented_chunk", "section_path",
-            "source_org", "source_url", "pub_date", "chunk_index"
-        ],
-        top=top_k,
+        select=_ID_SELECT,
     )
+    return [(r["chunk_id"], r.get("doc_id", ""), r.get("@search.score", 0.0)) for r in results]
 
-    # Convert to RetrievalResult objects
-    retrieval_results = []
-    for rank, result in enumerate(results, start=1):
-        # Azure Search returns a similarity score
-        similarity = result.get("@search.score", 0.0)
-
-        metadata = {
-            "chunk_id": result.get("chunk_id", ""),
-            "doc_id": result.get("doc_id", ""),
-            "doc_title": result.get("doc_title", ""),
-            "raw_chunk": result.get("raw_chunk", ""),
-            "ctx_header": result.get("ctx_header", ""),
-            "augmented_chunk": result.get("augmented_chunk", ""),
-            "section_path": result.get("section_path", ""),
-            "source_org": result.get("source_org", ""),
-            "source_url": result.get("source_url", ""),
-            "pub_date": result.get("pub_date", ""),
-            "chunk_index": result.get("chunk_index", 0),
-        }
 
-        retrieval_results.append(
-            RetrievalResult(
-                rank=rank,
-                similarity=similarity,
-                chunk_id=int(result.get("chunk_id", "0").split("_")[-1])
-                if "_" in result.get("chunk_id", "")
-                else 0,
-                metadata=metadata,
-            )
-        )
+def warm_up(
+    query_vectors: Optional[np.ndarray] = None,
+    n_queries: int = config.SEARCH_WARMUP_QUERIES,
+) -> int:
+    """Prime the index with a few vector queries so the first real one runs warm.
 
-    logger.info(f"Found {len(retrieval_results)} results")
-    return retrieval_results
+    Azure AI Search has no warmup API; the first queries after a build pay
+    for paging the HNSW graph (and quantized vectors) into memory. Rows of
+    ``query_vectors`` (e.g. a sample of the uploaded embeddings, which land
+    in populated regions of the graph) are used when given, else random unit
+    vectors. Only ids are requested. Failures are logged, not raised.
+
+    Returns:
+        Number of queries that completed
+    """
+    if n_queries <= 0:
+        return 0
+    if query_vectors is None or len(query_vectors) == 0:
+        query_vectors = np.random.default_rng().standard_normal((n_queries, config.EMBED_DIM_FALLBACK))
+    step = max(1, len(query_vectors) // n_queries)
+    done = 0
+    for vec in query_vectors[::step][:n_queries]:
+        try:
+            search_ids(vec, top_k=10)
+            done += 1
+        except Exception as e:
+            logger.warning(f"Warm-up query failed: {e}")
+            break
+    logger.info(f"Warmed {config.AZURE_SEARCH_INDEX_NAME} with {done} queries")
+    return done
+
+
+def hydrate(chunk_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch the full result fields for ``chunk_ids`` in one filtered query.
+
+    Returns:
+        ``{chunk_id: fields}`` for the ids found in the index
+    """
+    if not chunk_ids:
+        return {}
+    ids = ",".join(cid.replace("'", "''") for cid in chunk_ids)
+    results = _get_search_client().search(
+        search_text="*",
+        filter=f"search.in(chunk_id, '{ids}', ',')",
+        select=_RESULT_SELECT,
+        top=len(chunk_ids),
+    )
+    return {r["chunk_id"]: _result_metadata(r) for r in results}
+
+
+def indexed_ids(chunk_ids: List[str], batch_size: int = 1000) -> set:
+    """The subset of ``chunk_ids`` present in the index.
+
+    One filtered query per ``batch_size`` ids (the service's page cap),
+    selecting only the key, so checking reused rows costs a few small
+    requests rather than a re-upload.
+    """
+    found = set()
+    for i in range(0, len(chunk_ids), batch_size):
+        batch = chunk_ids[i:i + batch_size]
+        ids = ",".join(cid.replace("'", "''") for cid in batch)
+        results = _get_search_client().search(
+            search_text="*",
+            filter=f"search.in(chunk_id, '{ids}', ',')",
+            select=["chunk_id"],
+            top=len(batch),
+        )
+        found.update(r["chunk_id"] for r in results)
+    return found
 
 
 def delete_index() -> None:
@@ -354,10 +890,8 @@ def delete_index() -> None:
 
 def get_document_count() -> int:
     """Get the number of documents in the index."""
-    search_client = _get_search_client()
-    # Use a simple search to get count
-    results = search_client.search(search_text="*", include_total_count=True)
-    return results.get_count() or 0
+    # $count endpoint: no search is run and no documents come back
+    return _get_search_client().get_document_count()
 
 
 def search_text(
@@ -367,6 +901,10 @@ def search_text(
 ) -> List[RetrievalResult]:
     """Perform vector similarity search using text query (auto-vectorized by Azure).
 
+    A query whose vector is in the on-disk query cache (see
+    `rag.embed_cache.get_queries`) is sent as a plain vector query instead,
+    skipping the service-side embedding call.
+
     Args:
         query_text: Query text to search for (will be automatically vectorized)
         top_k: Number of top results to return
@@ -377,66 +915,43 @@ def search_text(
     """
     search_client = _get_search_client()
 
-    # Create vectorizable text query (Azure will generate embedding)
-    vector_query = VectorizableTextQuery(
-        text=query_text,
-        k_nearest_neighbors=top_k,
-        fields="embedding"
-    )
+    cached = embed_cache.get_queries([query_text], config.AOAI_EMBED_MODEL) if config.EMBED_CACHE_ENABLED else {}
+    if cached:
+        vector_query = _vector_query(cached[0], top_k)
+    else:
+        # Create vectorizable text query (Azure will generate embedding)
+        vector_query = VectorizableTextQuery(
+            text=query_text,
+            k_nearest_neighbors=top_k,
+            fields="embedding"
+        )
 
     # Perform vector search
     results = search_client.search(
         search_text=None,  # Pure vector search (no keyword search)
-        vector_queries=[vector_query],
+        vector_queries=[vector_query],  # k bounds the result count, so no separate top
         filter=filters,
-        select=[
-            "chunk_id", "doc_id", "doc_title", "raw_chunk",
-            "ctx_header", "augmented_chunk", "section_path",
-            "source_org", "source_url", "pub_date", "chunk_index"
-        ],
-        top=top_k,
+        select=_RESULT_SELECT,
     )
 
-    # Convert to RetrievalResult objects
-    retrieval_results = []
-    for rank, result in enumerate(results, start=1):
-        # Azure Search returns a similarity score
-        similarity = result.get("@search.score", 0.0)
-
-        metadata = {
-            "chunk_id": result.get("chunk_id", ""),
-            "doc_id": result.get("doc_id", ""),
-            "doc_title": result.get("doc_title", ""),
-            "raw_chunk": result.get("raw_chunk", ""),
-            "ctx_header": result.get("ctx_header", ""),
-            "augmented_chunk": result.get("augmented_chunk", ""),
-            "section_path": result.get("section_path", ""),
-            "source_org": result.get("source_org", ""),
-            "source_url": result.get("source_url", ""),
-            "pub_date": result.get("pub_date", ""),
-            "chunk_index": result.get("chunk_index", 0),
-        }
-
-        retrieval_results.append(
-            RetrievalResult(
-                rank=rank,
-                similarity=similarity,
-                chunk_id=int(result.get("chunk_id", "0").split("_")[-1])
-                if "_" in result.get("chunk_id", "")
-                else 0,
-                metadata=metadata,
-            )
-        )
-
+    retrieval_results = _to_retrieval_results(results)
     logger.info(f"Found {len(retrieval_results)} results")
     return retrieval_results
 
 
 __all__ = [
+    "build_index_definition",
     "create_search_index",
+    "UploadError",
     "upload_chunks",
+    "aembed_and_upload",
     "search",
+    "search_cached",
     "search_text",
+    "search_ids",
+    "warm_up",
+    "hydrate",
+    "indexed_ids",
     "delete_index",
     "get_document_count",
 ]
@@ -15,6 +15,7 @@ Public functions:
 - load_documents()
 - save_chunks(chunks)
 - load_chunks()
+- save_chunks_parquet(chunks) / load_chunks_parquet() [needs pyarrow]
 - save_embeddings(emb_matrix)
 - load_embeddings()
 - save_faiss_index(index) [local mode only]
@@ -24,19 +25,32 @@ Public functions:
 The build_or_load_index helper derives embeddings (if needed) and returns (index, metadata, embeddings).
 """
 from __future__ import annotations
-from typing import List, Sequence, Dict, Any, Tuple, Callable, Optional, Union
-import json, os, tempfile
+from typing import List, Sequence, Dict, Any, Tuple, Callable, Optional, Union, Iterable, Iterator
+import hashlib, json, os, tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import numpy as np
 
 from . import config
 from .models import Document, Chunk
-from .embeddings import get_embeddings_batch
+from .embeddings import get_embeddings_batch, embed_texts
+from .rate_limit import TokenBucket
+
+try:  # optional: faster JSON for the local cache files
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
+try:  # optional: columnar chunk cache (local mode prefers it when installed)
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ImportError:
+    pa = pq = None  # type: ignore
 
 # Import FAISS conditionally (only needed for local mode)
 try:
     import faiss  # type: ignore
-    from .index import build_faiss_index
+    from .index import build_faiss_index, load_index, save_index
     FAISS_AVAILABLE = True
 except ImportError:
     FAISS_AVAILABLE = False
@@ -51,18 +65,100 @@ except ImportError:
 
 DOCS_PATH = config.CACHE_DIR / "documents.json"
 CHUNKS_PATH = config.CACHE_DIR / "chunks.json"
+CHUNKS_PARQUET_PATH = CHUNKS_PATH.with_suffix(".parquet")
 EMB_PATH = config.CACHE_DIR / "embeddings.npy"
+TEXT_HASHES_PATH = config.CACHE_DIR / "texts_hashes.npy"  # row-aligned with EMB_PATH
 INDEX_PATH = config.CACHE_DIR / "faiss.index"
 META_PATH = config.CACHE_DIR / "metadata.json"
 
 # ----------------------- generic helpers -----------------------
 
-def _atomic_write(path: Path, data: bytes):
+# Buffers per os.writev call (POSIX guarantees at least 16; Linux allows 1024)
+_IOV_MAX = os.sysconf("SC_IOV_MAX") if hasattr(os, "sysconf") and "SC_IOV_MAX" in os.sysconf_names else 16
+
+
+def _write_parts(fd: int, parts: List[bytes]):
+    """Write ``parts`` to ``fd`` in one system call where the platform allows it."""
+    if hasattr(os, "writev"):
+        written = os.writev(fd, parts)
+        if written == sum(len(p) for p in parts):
+            return
+        rest = memoryview(b"".join(parts))[written:]  # short write: finish the remainder
+    else:  # Windows
+        rest = memoryview(b"".join(parts))
+    while rest:
+        rest = rest[os.write(fd, rest):]
+
+
+def _atomic_write(path: Path, data: Union[bytes, Iterable[bytes]]):
+    """Write ``data`` (one buffer or a stream of fragments) to a temp file, then rename over ``path``.
+
+    Fragments are written as they arrive in groups of up to ``_IOV_MAX`` with
+    ``os.writev``, so a large payload is never joined into one buffer.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
-        tmp.write(data)
-        tmp_path = Path(tmp.name)
-    tmp_path.replace(path)
+    parts = [data] if isinstance(data, bytes) else data
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+    try:
+        group: List[bytes] = []
+        for part in parts:
+            group.append(part)
+            if len(group) == _IOV_MAX:
+                _write_parts(fd, group)
+                group = []
+        if group:
+            _write_parts(fd, group)
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_name)
+        raise
+    os.close(fd)
+    Path(tmp_name).replace(path)
+
+
+def _json_default(obj: Any) -> Any:
+    if hasattr(obj, "tolist"):  # numpy arrays and scalars
+        return obj.tolist()
+    if hasattr(obj, "__dataclass_fields__"):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dump_json(payload: Any) -> bytes:
+    """Serialize to UTF-8 JSON, compact unless CACHE_JSON_PRETTY.
+
+    Dataclasses (Document, Chunk) and numpy values are accepted directly, so
+    callers don't build an intermediate dict per object. Uses orjson when it
+    is installed, the stdlib otherwise.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if config.CACHE_JSON_PRETTY else 0)
+        return orjson.dumps(payload, default=_json_default, option=option)
+    if config.CACHE_JSON_PRETTY:
+        return json.dumps(payload, ensure_ascii=False, indent=2, default=_json_default).encode("utf-8")
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def _json_parts(records: Sequence[Any]) -> Iterator[bytes]:
+    """Yield a JSON array of ``records`` as per-record fragments for `_atomic_write`.
+
+    Only compact orjson output is streamed; pretty or stdlib output is one fragment.
+    """
+    if orjson is None or config.CACHE_JSON_PRETTY:
+        yield _dump_json(list(records))
+        return
+    yield b"["
+    for i, record in enumerate(records):
+        if i:
+            yield b","
+        yield orjson.dumps(record, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    yield b"]"
+
+
+def _load_json(path: Path) -> Any:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text("utf-8"))
 
 # ----------------------- documents -----------------------------
 
@@ -74,8 +170,7 @@ def save_documents(docs: Sequence[Document]):
         azure_cosmos.save_documents(list(docs))
     else:
         # Local mode (default)
-        payload = [doc.__dict__ for doc in docs]
-        _atomic_write(DOCS_PATH, json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"))
+        _atomic_write(DOCS_PATH, _json_parts(docs))
 
 
 def load_documents() -> List[Document]:
@@ -88,7 +183,7 @@ def load_documents() -> List[Document]:
         # Local mode (default)
         if not DOCS_PATH.exists():
             return []
-        data = json.loads(DOCS_PATH.read_text("utf-8"))
+        data = _load_json(DOCS_PATH)
         return [Document(**d) for d in data]
 
 # ----------------------- chunks --------------------------------
@@ -101,8 +196,12 @@ def save_chunks(chunks: Sequence[Chunk]):
         azure_cosmos.save_chunks(list(chunks))
     else:
         # Local mode (default)
-        payload = [c.__dict__ for c in chunks]
-        _atomic_write(CHUNKS_PATH, json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"))
+        if pq is not None:
+            save_chunks_parquet(chunks)
+            # Drop the older JSON copy so a stale one is never read instead
+            CHUNKS_PATH.unlink(missing_ok=True)
+        else:
+            _atomic_write(CHUNKS_PATH, _json_parts(chunks))
 
 
 def load_chunks() -> List[Chunk]:
@@ -112,56 +211,130 @@ def load_chunks() -> List[Chunk]:
             raise RuntimeError("Azure modules not available. Install azure-cosmos.")
         return azure_cosmos.load_chunks()
     else:
-        # Local mode (default)
+        # Local mode (default); chunks.json from before the Parquet cache still loads
+        if pq is not None and CHUNKS_PARQUET_PATH.exists():
+            return load_chunks_parquet()
         if not CHUNKS_PATH.exists():
             return []
-        data = json.loads(CHUNKS_PATH.read_text("utf-8"))
+        data = _load_json(CHUNKS_PATH)
         return [Chunk(**c) for c in data]
 
+
+# Columns whose values repeat across a document's chunks; dictionary-encoded
+_PARQUET_DICT_COLUMNS = ["doc_id", "doc_title", "section_path", "source_org", "source_url", "pub_date"]
+
+
+def _chunk_schema():
+    return pa.schema([
+        (name, pa.int64() if name == "chunk_index" else pa.string())
+        for name in Chunk.__dataclass_fields__
+    ])
+
+
+def save_chunks_parquet(chunks: Sequence[Chunk], path: Path = CHUNKS_PARQUET_PATH):
+    """Write chunks as a zstd-compressed Parquet table (atomic, like the JSON files)."""
+    if pq is None:
+        raise RuntimeError("pyarrow not available. Install pyarrow.")
+    table = pa.Table.from_pylist([c.__dict__ for c in chunks], schema=_chunk_schema())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".parquet", delete=False) as tmp:
+        pq.write_table(table, tmp, compression="zstd", use_dictionary=_PARQUET_DICT_COLUMNS)
+        tmp_path = Path(tmp.name)
+    tmp_path.replace(path)
+
+
+def load_chunks_parquet(path: Path = CHUNKS_PARQUET_PATH) -> List[Chunk]:
+    if pq is None:
+        raise RuntimeError("pyarrow not available. Install pyarrow.")
+    if not path.exists():
+        return []
+    return [Chunk(**row) for row in pq.read_table(path).to_pylist()]
+
 # ----------------------- embeddings ----------------------------
 
-def save_embeddings(embeddings: np.ndarray):
-    embeddings = np.asarray(embeddings, dtype=np.float32)
-    np.save(EMB_PATH, embeddings)
+# Stored as float16: half the file size, and the rounding is far below what
+# cosine ranking can notice. The dtype lives in the .npy header, so older
+# float32 files still load as they are.
+EMB_STORE_DTYPE = np.float16
+
+
+_NPY_BLOCK_ROWS = 8192  # rows converted per step when the stored dtype differs
+
+
+def _save_npy(path: Path, array: np.ndarray, dtype: Optional[np.dtype] = None):
+    # Write to a temp file and rename so readers holding a memory map of the
+    # previous file never see it truncated. A dtype conversion is done block
+    # by block into a memory-mapped output, so no converted copy of the whole
+    # matrix is ever held in memory.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".npy", delete=False) as tmp:
+        tmp_path = Path(tmp.name)
+        if dtype is None or array.dtype == dtype:
+            np.save(tmp, array)
+    if dtype is not None and array.dtype != dtype:
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=array.shape)
+        for i in range(0, len(array), _NPY_BLOCK_ROWS):
+            out[i:i + _NPY_BLOCK_ROWS] = array[i:i + _NPY_BLOCK_ROWS]
+        out.flush()
+        del out
+    tmp_path.replace(path)
+
+
+def save_embeddings(embeddings: np.ndarray, text_hashes: Optional[np.ndarray] = None):
+    """Persist embeddings, plus the `_text_hashes` of their texts when given.
+
+    Without hashes any stale hash file is removed, so it can never describe
+    rows it wasn't written with.
+    """
+    _save_npy(EMB_PATH, np.asarray(embeddings), dtype=np.dtype(EMB_STORE_DTYPE))
+    if text_hashes is not None:
+        _save_npy(TEXT_HASHES_PATH, text_hashes)
+    elif TEXT_HASHES_PATH.exists():
+        TEXT_HASHES_PATH.unlink()
 
 
 def load_embeddings() -> Optional[np.ndarray]:
+    """Memory-map the cached embeddings read-only; rows are paged in on access.
+
+    Callers that need float32 should upcast the rows they use
+    (``emb[i:j].astype(np.float32)``) rather than the whole matrix.
+    """
     if not EMB_PATH.exists():
         return None
-    return np.load(EMB_PATH)
+    return np.load(EMB_PATH, mmap_mode="r")
 
 # ----------------------- metadata & index ----------------------
 
 def save_metadata(meta: Sequence[Dict[str, Any]]):
-    _atomic_write(META_PATH, json.dumps(list(meta), ensure_ascii=False, indent=2).encode("utf-8"))
+    _atomic_write(META_PATH, _json_parts(list(meta)))
 
 
 def load_metadata() -> List[Dict[str, Any]]:
     if not META_PATH.exists():
         return []
-    return json.loads(META_PATH.read_text("utf-8"))
+    return _load_json(META_PATH)
 
 
 def save_faiss_index(index):
-    """Save FAISS index (local mode only)."""
+    """Save FAISS index atomically (local mode only)."""
     if not FAISS_AVAILABLE:
         raise RuntimeError("FAISS not available. Install faiss-cpu.")
-    faiss.write_index(index, str(INDEX_PATH))
+    save_index(index, INDEX_PATH)
 
 
 def load_faiss_index() -> Optional[Any]:
-    """Load FAISS index (local mode only)."""
+    """Memory-map the saved FAISS index read-only (local mode only)."""
     if not FAISS_AVAILABLE:
         raise RuntimeError("FAISS not available. Install faiss-cpu.")
     if not INDEX_PATH.exists():
         return None
-    return faiss.read_index(str(INDEX_PATH))
+    return load_index(INDEX_PATH)
 
 # ----------------------- orchestration -------------------------
 
 def build_or_load_index(
     texts: Sequence[str],
-    metadata: Sequence[Dict[str, Any]],
+    metadata: Optional[Sequence[Dict[str, Any]]] = None,
     chunks: Optional[List[Chunk]] = None,
     embed_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
     force: bool = False,
@@ -175,10 +348,11 @@ def build_or_load_index(
     ----------
     texts : list of str
         The (augmented) chunk texts to embed.
-    metadata : list of dict
-        Parallel metadata aligned to texts.
+    metadata : list of dict, optional
+        Parallel metadata aligned to texts. Defaults to each chunk's own
+        field dict (``vars(chunk)``, shared rather than copied).
     chunks : list of Chunk, optional
-        Chunk objects (required for Azure mode).
+        Chunk objects (required for Azure mode, or when metadata is omitted).
     embed_fn : callable
         Embedding function (defaults to get_embeddings_batch).
     force : bool
@@ -192,6 +366,10 @@ def build_or_load_index(
         (index, metadata, embeddings) where index is either faiss.Index or None (for Azure mode)
     """
     embed_fn = embed_fn or get_embeddings_batch
+    if metadata is None:
+        if chunks is None:
+            raise ValueError("metadata or chunks is required")
+        metadata = [vars(chunk) for chunk in chunks]
 
     if config.STORAGE_MODE == "azure":
         return _build_or_load_azure_index(texts, metadata, chunks, embed_fn, force)
@@ -199,6 +377,123 @@ def build_or_load_index(
         return _build_or_load_local_index(texts, metadata, embed_fn, force, index_type)
 
 
+def _embed_all(texts: Sequence[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> np.ndarray:
+    """Embed ``texts`` batch by batch straight into one preallocated float32 matrix.
+
+    Up to EMBED_CONCURRENCY batches are in flight at once and requests are
+    paced by an EMBED_REQUESTS_PER_MIN token bucket instead of a fixed sleep
+    between batches. Rows land at their batch's offset whatever the completion
+    order, and the matrix is sized from the first finished batch, so no
+    list-of-lists copy of every embedding is held alongside it. ``embed_fn``
+    is responsible for its own retries (`get_embeddings_batch` backs off on 429s);
+    any exception it raises is re-raised here.
+
+    With the default ``get_embeddings_batch`` the work is handed to
+    `rag.embeddings.embed_texts`, the same concurrent, rate-limited pipeline
+    that also skips duplicate texts and texts already in the on-disk
+    embedding cache.
+    """
+    if embed_fn is get_embeddings_batch:
+        print(f"[embeddings] Processing {len(texts)} texts via embed_texts")
+        return embed_texts(texts)
+
+    batch_size = config.EMBED_BATCH_SIZE
+    workers = max(1, config.EMBED_CONCURRENCY)
+    limiter = TokenBucket(config.EMBED_REQUESTS_PER_MIN, burst=workers)
+    total_batches = (len(texts) + batch_size - 1) // batch_size
+    emb_matrix: Optional[np.ndarray] = None
+
+    def run(start: int) -> Tuple[int, List[List[float]]]:
+        limiter.acquire_blocking()
+        return start, embed_fn(list(texts[start:start + batch_size]))
+
+    print(f"[embeddings] Processing {len(texts)} texts in batches of {batch_size} ({workers} in flight)")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run, i) for i in range(0, len(texts), batch_size)]
+        for done, future in enumerate(as_completed(futures), 1):
+            start, batch_embeddings = future.result()
+            if not batch_embeddings:
+                raise RuntimeError(f"Failed to generate embeddings for batch {start//batch_size + 1}")
+            rows = np.asarray(batch_embeddings, dtype=np.float32)
+            if emb_matrix is None:
+                emb_matrix = np.empty((len(texts), rows.shape[1]), dtype=np.float32)
+            emb_matrix[start:start + len(rows)] = rows
+            del batch_embeddings, rows
+            print(f"[embeddings] Completed batch {done}/{total_batches}")
+
+    if emb_matrix is None:
+        raise RuntimeError("Failed to generate embeddings")
+    return emb_matrix
+
+
+def _text_hashes(texts: Sequence[str]) -> np.ndarray:
+    """16-byte blake2b digest of each text and the embedding model (and width, if truncated), as an ``S16`` array."""
+    model = config.AOAI_EMBED_MODEL
+    if config.EMBED_DIMENSIONS > 0:
+        model = f"{model}:{config.EMBED_DIMENSIONS}"
+    return np.array(
+        [hashlib.blake2b(f"{model}:{t}".encode("utf-8"), digest_size=16).digest() for t in texts],
+        dtype="S16",
+    )
+
+
+def _cache_matches(texts: Sequence[str]) -> bool:
+    """True if the cached embeddings were built from exactly ``texts``, in order.
+
+    ``texts_hashes.npy`` doubles as the content fingerprint of the cache. The
+    row count and the first and last digests are checked before hashing every
+    text, so an edited corpus is usually rejected without the O(N) pass.
+    """
+    if not texts or not TEXT_HASHES_PATH.exists():
+        return False
+    cached_hashes = np.load(TEXT_HASHES_PATH)
+    if len(cached_hashes) != len(texts):
+        return False
+    if not np.array_equal(_text_hashes([texts[0], texts[-1]]), cached_hashes[[0, -1]]):
+        return False
+    return np.array_equal(_text_hashes(texts), cached_hashes)
+
+
+def _embed_incremental(
+    texts: Sequence[str],
+    embed_fn: Callable[[List[str]], List[List[float]]],
+) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+    """Embed only the texts whose vectors are not already in the local cache.
+
+    Rows of the cached ``embeddings.npy`` are matched to ``texts`` through the
+    row-aligned ``texts_hashes.npy``; everything else goes through `_embed_all`
+    and is spliced back in order.
+
+    Returns
+    -------
+    tuple
+        (embeddings, text hashes, positions that were newly embedded)
+    """
+    hashes = _text_hashes(texts)
+    cached_emb = load_embeddings()
+    cached_hashes = np.load(TEXT_HASHES_PATH) if TEXT_HASHES_PATH.exists() else None
+    if cached_emb is None or cached_hashes is None or len(cached_hashes) != len(cached_emb):
+        return _embed_all(texts, embed_fn), hashes, list(range(len(texts)))
+
+    row_of = {h: i for i, h in enumerate(cached_hashes.tolist())}
+    keys = hashes.tolist()
+    reused = [i for i, h in enumerate(keys) if h in row_of]
+    missing = [i for i, h in enumerate(keys) if h not in row_of]
+    if not reused:
+        return _embed_all(texts, embed_fn), hashes, missing
+
+    print(f"[embeddings] Reusing {len(reused)} cached embeddings, embedding {len(missing)} new texts")
+    emb_matrix = np.empty((len(texts), cached_emb.shape[1]), dtype=np.float32)
+    emb_matrix[reused] = cached_emb[[row_of[keys[i]] for i in reused]]
+    if missing:
+        new_rows = _embed_all([texts[i] for i in missing], embed_fn)
+        if new_rows.shape[1] != emb_matrix.shape[1]:
+            print("[embeddings] Embedding width changed, re-embedding everything")
+            return _embed_all(texts, embed_fn), hashes, list(range(len(texts)))
+        emb_matrix[missing] = new_rows
+    return emb_matrix, hashes, missing
+
+
 def _build_or_load_local_index(
     texts: Sequence[str],
     metadata: Sequence[Dict[str, Any]],
@@ -214,39 +509,23 @@ def _build_or_load_local_index(
     cached_emb = load_embeddings()
     cached_meta = load_metadata()
 
-    if not force and cached_index and cached_emb is not None and cached_meta and len(cached_meta) == len(texts):
-        # Assume cache is valid if counts match
+    if (not force and cached_index is not None and cached_emb is not None
+            and len(cached_meta) == len(cached_emb) == cached_index.ntotal
+            and _cache_matches(texts)):
+        # Cache is valid only if it was built from these exact texts
         print(f"[cache] Using cached index with {len(cached_meta)} vectors")
         return cached_index, cached_meta, cached_emb
 
-    # Build fresh with batching and delays to avoid rate limits
-    batch_size = config.EMBED_BATCH_SIZE
-    batch_delay = config.EMBED_DELAY_SECONDS
-    embeddings_list = []
-
-    print(f"[embeddings] Processing {len(texts)} texts in batches of {batch_size} (delay: {batch_delay}s)")
-    for i in range(0, len(texts), batch_size):
-        batch = list(texts[i:i + batch_size])
-        batch_embeddings = embed_fn(batch)
-        if not batch_embeddings:
-            raise RuntimeError(f"Failed to generate embeddings for batch {i//batch_size + 1}")
-        embeddings_list.extend(batch_embeddings)
-        batch_num = i//batch_size + 1
-        total_batches = (len(texts) + batch_size - 1)//batch_size
-        print(f"[embeddings] Completed batch {batch_num}/{total_batches}")
-
-        # Add delay between batches (except for last batch)
-        if batch_num < total_batches:
-            import time
-            time.sleep(batch_delay)
-
-    if not embeddings_list:
-        raise RuntimeError("Failed to generate embeddings")
-    emb_matrix = np.asarray(embeddings_list, dtype=np.float32)
-    index = build_faiss_index(embeddings_list, index_type=index_type)
+    # Build fresh with concurrent, rate-limited batches (unless forced, texts
+    # embedded on a previous run are reused)
+    if force:
+        emb_matrix, hashes = _embed_all(texts, embed_fn), _text_hashes(texts)
+    else:
+        emb_matrix, hashes, _ = _embed_incremental(texts, embed_fn)
+    index = build_faiss_index(emb_matrix, index_type=index_type)
 
     # Persist
-    save_embeddings(emb_matrix)
+    save_embeddings(emb_matrix, hashes)
     save_faiss_index(index)
     save_metadata(metadata)
 
@@ -268,53 +547,57 @@ def _build_or_load_azure_index(
         raise ValueError("chunks parameter is required for Azure mode")
 
     # Check if index already exists
+    doc_count: Optional[int] = None
     try:
         doc_count = azure_search.get_document_count()
         if not force and doc_count == len(texts):
             print(f"[cache] Azure Search index exists with {doc_count} documents")
             # Still need to load/generate embeddings for compatibility
             cached_emb = load_embeddings()
-            if cached_emb is not None and len(cached_emb) == len(texts):
+            if cached_emb is not None and _cache_matches(texts):
                 return None, list(metadata), cached_emb
     except Exception as e:
         print(f"[cache] Azure Search index doesn't exist or error checking: {e}")
 
-    # Create the index schema
+    # Create the index schema on a worker thread: its REST round-trips do not
+    # depend on the embeddings, so they overlap the embedding requests and are
+    # only waited for before the upload.
     print("[azure] Creating Azure AI Search index...")
-    azure_search.create_search_index()
-
-    # Generate embeddings with batching
-    batch_size = config.EMBED_BATCH_SIZE
-    batch_delay = config.EMBED_DELAY_SECONDS
-    embeddings_list = []
-
-    print(f"[embeddings] Processing {len(texts)} texts in batches of {batch_size} (delay: {batch_delay}s)")
-    for i in range(0, len(texts), batch_size):
-        batch = list(texts[i:i + batch_size])
-        batch_embeddings = embed_fn(batch)
-        if not batch_embeddings:
-            raise RuntimeError(f"Failed to generate embeddings for batch {i//batch_size + 1}")
-        embeddings_list.extend(batch_embeddings)
-        batch_num = i//batch_size + 1
-        total_batches = (len(texts) + batch_size - 1)//batch_size
-        print(f"[embeddings] Completed batch {batch_num}/{total_batches}")
-
-        # Add delay between batches (except for last batch)
-        if batch_num < total_batches:
-            import time
-            time.sleep(batch_delay)
-
-    if not embeddings_list:
-        raise RuntimeError("Failed to generate embeddings")
-
-    emb_matrix = np.asarray(embeddings_list, dtype=np.float32)
-
-    # Upload chunks with embeddings to Azure Search
-    print(f"[azure] Uploading {len(chunks)} chunks to Azure AI Search...")
-    azure_search.upload_chunks(chunks, emb_matrix)
-
-    # Save embeddings locally for backup/compatibility
-    save_embeddings(emb_matrix)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        schema = executor.submit(azure_search.create_search_index)
+
+        # Generate embeddings with batching; unless forced, only texts missing
+        # from the local embeddings cache are sent to the API
+        if force:
+            emb_matrix, hashes = _embed_all(texts, embed_fn), _text_hashes(texts)
+            missing = list(range(len(texts)))
+        else:
+            emb_matrix, hashes, missing = _embed_incremental(texts, embed_fn)
+        schema.result()
+
+    # Upload chunks with embeddings to Azure Search. Reused rows are only
+    # skipped when the index is known to hold their ids; a document count
+    # cannot show which rows an earlier partial upload missed.
+    to_send = list(range(len(texts)))
+    if doc_count and len(missing) < len(texts):
+        missing_set = set(missing)
+        reused = [i for i in range(len(texts)) if i not in missing_set]
+        present = azure_search.indexed_ids([chunks[i].chunk_id for i in reused])
+        to_send = sorted(missing_set | {i for i in reused if chunks[i].chunk_id not in present})
+    print(f"[azure] Uploading {len(to_send)} of {len(chunks)} chunks to Azure AI Search...")
+    try:
+        if len(to_send) == len(chunks):
+            azure_search.upload_chunks(chunks, emb_matrix)
+        elif to_send:
+            azure_search.upload_chunks([chunks[i] for i in to_send], emb_matrix[to_send])
+    except azure_search.UploadError:
+        # Leave the local cache as it was, so these rows are not taken as indexed next run
+        print("[azure] Upload incomplete; embeddings cache not updated")
+        raise
+    azure_search.warm_up(emb_matrix)
+
+    # Save embeddings locally for backup/compatibility (only after every document was accepted)
+    save_embeddings(emb_matrix, hashes)
     save_metadata(metadata)
 
     print("[azure] Azure AI Search index built successfully")
@@ -325,6 +608,8 @@ __all__ = [
     "load_documents",
     "save_chunks",
     "load_chunks",
+    "save_chunks_parquet",
+    "load_chunks_parquet",
     "save_embeddings",
     "load_embeddings",
     "save_faiss_index",
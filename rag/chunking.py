@@ -5,18 +5,44 @@ is modular so it can be swapped for more advanced approaches later.
 """
 from __future__ import annotations
 from typing import List, Dict
-import re
 import uuid
 
-from .config import SEMANTIC_MAX_WORDS
+from .config import SEMANTIC_MAX_WORDS, SEMANTIC_STRIDE_WORDS
 from .models import Document, Chunk
 
-__all__ = ["split_by_semantic_boundaries", "SemanticChunker"]
+__all__ = ["split_by_semantic_boundaries", "split_by_sliding_window", "SemanticChunker"]
 
 def _normalize_whitespace(text: str) -> str:
-    return re.sub(r"\s+", " ", text or "").strip()
+    # str.split() splits on the same Unicode whitespace as r"\s+" and drops
+    # empty ends, so this equals re.sub(r"\s+", " ", text).strip() without
+    # running the regex engine
+    return " ".join((text or "").split())
 
-def split_by_semantic_boundaries(text: str, max_words: int = SEMANTIC_MAX_WORDS) -> List[Dict]:
+def split_by_sliding_window(text: str, max_words: int = SEMANTIC_MAX_WORDS, stride: int = SEMANTIC_STRIDE_WORDS) -> List[Dict]:
+    """Fixed windows of ``max_words`` words starting every ``stride`` words.
+
+    The text is split into words once; each window is a join over a slice of
+    that list, so consecutive windows share ``max_words - stride`` words
+    without rescanning the text. The last window ends at the final word.
+    """
+    if not 0 < stride <= max_words:
+        raise ValueError(f"stride must be between 1 and max_words ({max_words}), got {stride}")
+    words = (text or "").split()
+    chunks: List[Dict] = []
+    start = 0
+    while start < len(words):
+        window = words[start:start + max_words]
+        chunks.append({"text": " ".join(window), "word_count": len(window)})
+        if start + max_words >= len(words):
+            break
+        start += stride
+    return chunks
+
+def split_by_semantic_boundaries(
+    text: str, max_words: int = SEMANTIC_MAX_WORDS, stride: int = SEMANTIC_STRIDE_WORDS
+) -> List[Dict]:
+    if stride:
+        return split_by_sliding_window(text, max_words, stride)
     paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
     chunks: List[Dict] = []
     cur = []
@@ -40,8 +66,9 @@ def split_by_semantic_boundaries(text: str, max_words: int = SEMANTIC_MAX_WORDS)
 class SemanticChunker:
     """Semantic chunker that splits documents into chunks with semantic boundaries."""
 
-    def __init__(self, max_words: int = SEMANTIC_MAX_WORDS):
+    def __init__(self, max_words: int = SEMANTIC_MAX_WORDS, stride: int = SEMANTIC_STRIDE_WORDS):
         self.max_words = max_words
+        self.stride = stride
 
     def chunk_documents(self, documents: List[Document]) -> List[Chunk]:
         """Chunk a list of documents.
@@ -55,7 +82,7 @@ class SemanticChunker:
         all_chunks = []
 
         for doc in documents:
-            chunk_dicts = split_by_semantic_boundaries(doc.content, self.max_words)
+            chunk_dicts = split_by_semantic_boundaries(doc.content, self.max_words, self.stride)
 
             for idx, chunk_dict in enumerate(chunk_dicts):
                 chunk = Chunk(
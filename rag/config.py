@@ -5,9 +5,12 @@ constants with safe access patterns. This module should be imported
 by other modules instead of re-reading the environment.
 """
 from __future__ import annotations
+import functools
+import importlib.util
 import os
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 from dotenv import dotenv_values  # type: ignore
 
@@ -19,19 +22,35 @@ CACHE_DIR = PROJECT_ROOT / "cache"
 for d in (DATA_DIR, PDF_DIR, CACHE_DIR):
     d.mkdir(exist_ok=True, parents=True)
 
-_env = {}
-if (PROJECT_ROOT / ".env").exists():
+@functools.lru_cache(maxsize=1)
+def _load_env() -> Mapping[str, str]:
+    """Parse `.env` once per process into a read-only mapping of cleaned, non-empty values."""
+    path = PROJECT_ROOT / ".env"
+    if not path.exists():
+        return MappingProxyType({})
+    values = {}
     # Raw load (does not mutate os.environ)
-    _env = dotenv_values(PROJECT_ROOT / ".env")  # type: ignore
-    # Inject into process env if not already set so downstream modules using os.getenv see them.
-    for k, v in _env.items():
+    for k, v in dotenv_values(path).items():  # type: ignore
         if v is None:
             continue
         # strip leading/trailing whitespace (common when .env lines are indented in notebooks)
         cleaned = str(v).strip().strip('"')
-        if k not in os.environ and cleaned:
-            os.environ[k] = cleaned
+        if cleaned:
+            values[k] = cleaned
+    return MappingProxyType(values)
 
+
+def _inject_env() -> None:
+    # Inject into process env if not already set so downstream modules using
+    # os.getenv see them, and so _get needs only the one lookup.
+    for k, v in _load_env().items():
+        if k not in os.environ:
+            os.environ[k] = v
+
+
+_inject_env()
+
+@functools.lru_cache(maxsize=32)
 def _normalize_endpoint(ep: str | None) -> str | None:
     if not ep:
         return ep
@@ -44,7 +63,7 @@ def _normalize_endpoint(ep: str | None) -> str | None:
 
 
 def _get(name: str, required: bool = False, default: Optional[str] = None) -> Optional[str]:
-    val = os.getenv(name) or _env.get(name) or default
+    val = os.getenv(name) or default
     if required and not val:
         raise RuntimeError(f"Missing required environment variable: {name}")
     return val
@@ -59,6 +78,31 @@ AOAI_CHAT_MODEL = _get("AOAI_CHAT_MODEL", required=True)
 AZURE_SEARCH_ENDPOINT = _get("AZURE_SEARCH_ENDPOINT")  # e.g. https://medctx-demo-search.search.windows.net
 AZURE_SEARCH_KEY = _get("AZURE_SEARCH_KEY")
 AZURE_SEARCH_INDEX_NAME = _get("AZURE_SEARCH_INDEX_NAME", default="medical-context-index")
+SEARCH_UPLOAD_CONCURRENCY = int(os.getenv("SEARCH_UPLOAD_CONCURRENCY", 8))  # Parallel upload batches
+SEARCH_UPLOAD_BATCH_SIZE = int(os.getenv("SEARCH_UPLOAD_BATCH_SIZE", 0))  # 0 = size from vector dimension
+SEARCH_AUTO_FLUSH_INTERVAL = int(os.getenv("SEARCH_AUTO_FLUSH_INTERVAL", 60))  # Max seconds a partial upload batch waits
+SEARCH_UPLOAD_GZIP = os.getenv("SEARCH_UPLOAD_GZIP", "0") == "1"  # Gzip upload request bodies
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", 1024))  # Repeated queries served in-process; 0 disables
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 300))  # Seconds a cached result list stays valid
+SEARCH_WARMUP_QUERIES = int(os.getenv("SEARCH_WARMUP_QUERIES", 5))  # Priming queries after an index build; 0 disables
+QUERY_EMBED_CACHE_TTL = float(os.getenv("QUERY_EMBED_CACHE_TTL", 3600))  # Seconds an on-disk query vector is reused; 0 disables
+QUERY_VECTOR_CACHE_SIZE = int(os.getenv("QUERY_VECTOR_CACHE_SIZE", 1024))  # Query vectors kept in-process per retriever; 0 disables
+
+# Cross-encoder reranking of vector candidates (needs sentence-transformers)
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "0") == "1"
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", 50))  # Candidates fetched and rescored per query
+RERANK_MODEL = _get("RERANK_MODEL", default="BAAI/bge-reranker-base")  # CrossEncoder model name or path
+if RERANK_ENABLED and importlib.util.find_spec("sentence_transformers") is None:
+    # Fail at startup rather than on the first reranked query
+    raise RuntimeError("RERANK_ENABLED=1 needs sentence-transformers. Install it or set RERANK_ENABLED=0.")
+
+# HNSW graph parameters for the Azure Search vector index (applied at index creation)
+HNSW_M = int(os.getenv("HNSW_M", 10))  # Graph degree; Azure accepts 4-10, keep the max for recall
+HNSW_EFC = int(os.getenv("HNSW_EFC", 200))  # Candidate list size while building (100-1000)
+HNSW_EFS = int(os.getenv("HNSW_EFS", 100))  # Candidate list size while querying (100-1000; >= 4x top_k)
+SEARCH_VECTOR_TYPE = _get("SEARCH_VECTOR_TYPE", default="single")  # Embedding field element type: single (float32) or half (float16)
+SEARCH_VECTOR_COMPRESSION = os.getenv("SEARCH_VECTOR_COMPRESSION", "1") == "1"  # int8 scalar quantization
+SEARCH_VECTOR_OVERSAMPLING = float(os.getenv("SEARCH_VECTOR_OVERSAMPLING", 4.0))  # Candidates rescored per requested result
 
 # Azure Cosmos DB (for document/chunk storage - replaces local JSON)
 COSMOS_ENDPOINT = _get("COSMOS_ENDPOINT")
@@ -66,13 +110,20 @@ COSMOS_KEY = _get("COSMOS_KEY")
 COSMOS_DB_NAME = _get("COSMOS_DB_NAME", default="medical-context-db")
 COSMOS_CONTAINER_DOCUMENTS = _get("COSMOS_CONTAINER_DOCUMENTS", default="documents")
 COSMOS_CONTAINER_CHUNKS = _get("COSMOS_CONTAINER_CHUNKS", default="chunks")
+COSMOS_WRITE_CONCURRENCY = int(os.getenv("COSMOS_WRITE_CONCURRENCY", 16))  # Parallel upserts in save_* calls
+COSMOS_THROTTLE_RETRIES = int(os.getenv("COSMOS_THROTTLE_RETRIES", 5))  # Backoffs per upsert after the SDK's own 429 retries
 
 # Storage mode: 'local' (FAISS + JSON) or 'azure' (Azure Search + Cosmos DB)
 # This allows incremental migration and fallback
 STORAGE_MODE = _get("STORAGE_MODE", default="local")
+FAISS_INDEX_TYPE = _get("FAISS_INDEX_TYPE", default="auto")  # Local index: auto, flat, sq8, ivf, ivfpq, hnsw or hnsw_sq8
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", 32))  # Graph links per node
+FAISS_HNSW_EF_CONSTRUCTION = int(os.getenv("FAISS_HNSW_EF_CONSTRUCTION", 200))  # Build-time candidate list
+FAISS_HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", 50))  # Query-time candidate list floor (raised to 4*top_k)
 
 # Chunk / header constants (centralized)
 SEMANTIC_MAX_WORDS = int(os.getenv("SEMANTIC_MAX_WORDS", 300))
+SEMANTIC_STRIDE_WORDS = int(os.getenv("SEMANTIC_STRIDE_WORDS", 0))  # >0: overlapping word windows (e.g. 0.75*max); 0: paragraph grouping
 HEADER_MAX_CHARS = int(os.getenv("HEADER_MAX_CHARS", 200))
 
 # Concurrency / rate limits
@@ -81,15 +132,25 @@ TOKENS_PER_MIN = int(os.getenv("TOKENS_PER_MIN", 60000))
 EST_TOKENS_PER_REQUEST = int(os.getenv("EST_TOKENS_PER_REQUEST", 200))
 MAX_CONCURRENT = int(os.getenv("MAX_CONCURRENT", 8))
 BATCH_SIZE = int(os.getenv("HEADER_BATCH_SIZE", 50))
-
-# Embeddings - Conservative settings to avoid 429 errors
-EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 5))  # Reduced from 10 to 5
-EMBED_DELAY_SECONDS = float(os.getenv("EMBED_DELAY_SECONDS", 2.0))  # Delay between batches
-EMBED_DIM_FALLBACK = int(os.getenv("EMBED_DIM_FALLBACK", 3072))  # Match text-embedding-3-large
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"  # Reuse headers for unchanged prompts
+
+# Embeddings - multi-input requests; embed_texts paces itself from rate-limit headers
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))  # Inputs per request (service max 2048)
+EMBED_DELAY_SECONDS = float(os.getenv("EMBED_DELAY_SECONDS", 2.0))  # Legacy; batches are now paced by EMBED_REQUESTS_PER_MIN
+EMBED_DIMENSIONS = int(os.getenv("EMBED_DIMENSIONS", 0))  # >0: truncated (Matryoshka) vectors from text-embedding-3 models; 0: native width
+EMBED_DIM_FALLBACK = int(os.getenv("EMBED_DIM_FALLBACK", EMBED_DIMENSIONS or 3072))  # Vector width; matches text-embedding-3-large
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", 4))  # Embedding requests in flight at once
+EMBED_REQUESTS_PER_MIN = int(os.getenv("EMBED_REQUESTS_PER_MIN", REQUESTS_PER_MIN))  # Token-bucket refill rate; 0 disables
+EMBED_TOKENS_PER_MIN = int(os.getenv("EMBED_TOKENS_PER_MIN", TOKENS_PER_MIN))  # Input-token budget per minute; 0 disables
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE_ENABLED", "1") == "1"  # Reuse vectors for unchanged texts
+EMBED_HTTP2 = os.getenv("EMBED_HTTP2", "1") == "1"  # Multiplex requests over one connection when h2 is installed
 
 # Persistence paths
 INDEX_PATH = PROJECT_ROOT / "faiss_medical_index.bin"
 CHUNK_METADATA_PATH = PROJECT_ROOT / "chunk_metadata.json"
+EMBED_CACHE_PATH = CACHE_DIR / "embedding_cache.sqlite"
+LLM_CACHE_PATH = CACHE_DIR / "llm_cache.sqlite"
+CACHE_JSON_PRETTY = os.getenv("CACHE_JSON_PRETTY", "0") == "1"  # Indent cache/*.json for reading by hand
 
 VERSION = "0.1.0"
 
@@ -105,13 +166,38 @@ __all__ = [
     "AZURE_SEARCH_ENDPOINT",
     "AZURE_SEARCH_KEY",
     "AZURE_SEARCH_INDEX_NAME",
+    "SEARCH_UPLOAD_CONCURRENCY",
+    "SEARCH_UPLOAD_BATCH_SIZE",
+    "SEARCH_AUTO_FLUSH_INTERVAL",
+    "SEARCH_UPLOAD_GZIP",
+    "SEARCH_CACHE_SIZE",
+    "SEARCH_CACHE_TTL",
+    "SEARCH_WARMUP_QUERIES",
+    "QUERY_EMBED_CACHE_TTL",
+    "QUERY_VECTOR_CACHE_SIZE",
+    "RERANK_ENABLED",
+    "RERANK_TOP_N",
+    "RERANK_MODEL",
+    "HNSW_M",
+    "HNSW_EFC",
+    "HNSW_EFS",
+    "SEARCH_VECTOR_TYPE",
+    "SEARCH_VECTOR_COMPRESSION",
+    "SEARCH_VECTOR_OVERSAMPLING",
     "COSMOS_ENDPOINT",
     "COSMOS_KEY",
     "COSMOS_DB_NAME",
     "COSMOS_CONTAINER_DOCUMENTS",
     "COSMOS_CONTAINER_CHUNKS",
+    "COSMOS_WRITE_CONCURRENCY",
+    "COSMOS_THROTTLE_RETRIES",
     "STORAGE_MODE",
+    "FAISS_INDEX_TYPE",
+    "FAISS_HNSW_M",
+    "FAISS_HNSW_EF_CONSTRUCTION",
+    "FAISS_HNSW_EF_SEARCH",
     "SEMANTIC_MAX_WORDS",
+    "SEMANTIC_STRIDE_WORDS",
     "HEADER_MAX_CHARS",
     "REQUESTS_PER_MIN",
     "TOKENS_PER_MIN",
@@ -120,8 +206,18 @@ __all__ = [
     "BATCH_SIZE",
     "EMBED_BATCH_SIZE",
     "EMBED_DELAY_SECONDS",
+    "EMBED_DIMENSIONS",
     "EMBED_DIM_FALLBACK",
+    "EMBED_CONCURRENCY",
+    "EMBED_REQUESTS_PER_MIN",
+    "EMBED_TOKENS_PER_MIN",
+    "EMBED_CACHE_ENABLED",
+    "EMBED_HTTP2",
     "INDEX_PATH",
     "CHUNK_METADATA_PATH",
+    "EMBED_CACHE_PATH",
+    "LLM_CACHE_ENABLED",
+    "LLM_CACHE_PATH",
+    "CACHE_JSON_PRETTY",
     "VERSION",
 ]
@@ -0,0 +1,146 @@
+"""Content-addressed on-disk cache for embedding vectors.
+
+Vectors are stored in a small SQLite database keyed by a SHA-256 digest of the
+embedding model name, the configured vector width and the exact input text, so
+re-running an ingestion script only sends new or changed texts to the
+embeddings endpoint, and switching models or dimensions never returns stale
+vectors. Rows are kept as float16 (half the size of float32; the rounding is
+far below what cosine ranking can notice) and widened back to float32 on read.
+
+Query vectors live in a second table with the time they were stored, keyed on
+the whitespace-normalized query, and are only returned while younger than
+QUERY_EMBED_CACHE_TTL, so an in-place deployment update is picked up within
+the TTL.
+
+Public functions:
+- text_key(text, model, dim)
+- get_cached(texts, model) -> ({position: vector}, [(position, text), ...misses])
+- store(texts, vectors, model)
+- get_queries(queries, model) -> {position: vector}
+- store_queries(queries, vectors, model)
+"""
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+from . import config
+
+_SQL_VAR_LIMIT = 500  # stay well below SQLite's bound-parameter limit
+_STORE_DTYPE = np.float16
+
+
+def text_key(text: str, model: str, dim: int = config.EMBED_DIM_FALLBACK) -> str:
+    return hashlib.sha256(f"{model}:{dim}:{text}".encode("utf-8")).hexdigest()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB)")
+    conn.execute("CREATE TABLE IF NOT EXISTS query_embeddings (key TEXT PRIMARY KEY, vec BLOB, stored REAL)")
+    return conn
+
+
+def get_cached(
+    texts: Sequence[str],
+    model: str,
+    dim: int = config.EMBED_DIM_FALLBACK,
+    path: Path = config.EMBED_CACHE_PATH,
+) -> Tuple[Dict[int, np.ndarray], List[Tuple[int, str]]]:
+    """Split ``texts`` into cached vectors keyed by position and ``(position, text)`` misses."""
+    keys = [text_key(t, model, dim) for t in texts]
+    found: Dict[str, np.ndarray] = {}
+    with _connect(path) as conn:
+        unique = list(set(keys))
+        for i in range(0, len(unique), _SQL_VAR_LIMIT):
+            part = unique[i:i + _SQL_VAR_LIMIT]
+            rows = conn.execute(
+                f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=_STORE_DTYPE).astype(np.float32)
+    conn.close()
+    hits = {i: found[k] for i, k in enumerate(keys) if k in found}
+    misses = [(i, t) for i, t in enumerate(texts) if i not in hits]
+    return hits, misses
+
+
+def store(
+    texts: Sequence[str],
+    vectors: np.ndarray,
+    model: str,
+    dim: int = config.EMBED_DIM_FALLBACK,
+    path: Path = config.EMBED_CACHE_PATH,
+) -> None:
+    """Insert or replace vectors for ``texts``. All-zero rows (failed calls) are skipped."""
+    vectors = np.asarray(vectors, dtype=_STORE_DTYPE)
+    rows: List[tuple] = [
+        (text_key(t, model, dim), vec.tobytes())
+        for t, vec in zip(texts, vectors)
+        if vec.any()
+    ]
+    if not rows:
+        return
+    with _connect(path) as conn:
+        conn.executemany("INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)", rows)
+    conn.close()
+
+
+def _query_key(query: str, model: str, dim: int) -> str:
+    return text_key(" ".join(query.split()), model, dim)
+
+
+def get_queries(
+    queries: Sequence[str],
+    model: str,
+    dim: int = config.EMBED_DIM_FALLBACK,
+    path: Path = config.EMBED_CACHE_PATH,
+    ttl: float = config.QUERY_EMBED_CACHE_TTL,
+) -> Dict[int, np.ndarray]:
+    """Cached vectors for ``queries`` stored less than ``ttl`` seconds ago, keyed by position."""
+    if ttl <= 0 or not queries:
+        return {}
+    keys = [_query_key(q, model, dim) for q in queries]
+    found: Dict[str, np.ndarray] = {}
+    with _connect(path) as conn:
+        unique = list(set(keys))
+        for i in range(0, len(unique), _SQL_VAR_LIMIT):
+            part = unique[i:i + _SQL_VAR_LIMIT]
+            rows = conn.execute(
+                f"SELECT key, vec FROM query_embeddings WHERE stored >= ? AND key IN ({','.join('?' * len(part))})",
+                [time.time() - ttl, *part],
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=_STORE_DTYPE).astype(np.float32)
+    conn.close()
+    return {i: found[k] for i, k in enumerate(keys) if k in found}
+
+
+def store_queries(
+    queries: Sequence[str],
+    vectors: np.ndarray,
+    model: str,
+    dim: int = config.EMBED_DIM_FALLBACK,
+    path: Path = config.EMBED_CACHE_PATH,
+) -> None:
+    """Insert or refresh query vectors. All-zero rows (failed calls) are skipped."""
+    vectors = np.asarray(vectors, dtype=_STORE_DTYPE)
+    now = time.time()
+    rows: List[tuple] = [
+        (_query_key(q, model, dim), vec.tobytes(), now)
+        for q, vec in zip(queries, vectors)
+        if vec.any()
+    ]
+    if not rows:
+        return
+    with _connect(path) as conn:
+        conn.executemany("INSERT OR REPLACE INTO query_embeddings (key, vec, stored) VALUES (?, ?, ?)", rows)
+    conn.close()
+
+
+__all__ = ["text_key", "get_cached", "store", "get_queries", "store_queries"]
@@ -3,22 +3,80 @@
 Keeps a single function `get_embeddings_batch` that other modules can import.
 Provides robust retry logic with exponential backoff for rate limits (429 errors)
 and returns zero vectors on failure to avoid crashing downstream logic during exploratory work.
+
+`embed_texts` is the bulk entry point for ingestion scripts: it sends one request
+per batch of texts, paces itself from the service's rate-limit headers instead
+of sleeping a fixed interval between batches, and skips texts whose vectors are
+already in the content-addressed cache (`rag.embed_cache`). `aembed_texts` is
+the same pipeline on asyncio, fanning batches out with `asyncio.gather`.
 """
 from __future__ import annotations
-from typing import List, Sequence
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Sequence, Tuple
 import os
 import time
 import random
 import numpy as np
 
-from .config import AOAI_EMBED_MODEL, EMBED_DIM_FALLBACK
+from .config import (
+    AOAI_EMBED_MODEL,
+    EMBED_DIM_FALLBACK,
+    EMBED_DIMENSIONS,
+    EMBED_BATCH_SIZE,
+    EMBED_CACHE_ENABLED,
+    EMBED_CONCURRENCY,
+    EMBED_HTTP2,
+    EMBED_REQUESTS_PER_MIN,
+    EMBED_TOKENS_PER_MIN,
+)
+from . import embed_cache
+from .rate_limit import TokenBucket
+
+# Extra embeddings.create arguments; `dimensions` only when truncation is asked for
+_CREATE_KWARGS = {"dimensions": EMBED_DIMENSIONS} if EMBED_DIMENSIONS > 0 else {}
 
 try:  # pragma: no cover - import variability
-    from openai import OpenAI, AzureOpenAI  # type: ignore
+    from openai import OpenAI, AzureOpenAI, AsyncOpenAI, AsyncAzureOpenAI  # type: ignore
 except ImportError:  # graceful degradation
-    OpenAI = AzureOpenAI = None  # type: ignore
+    OpenAI = AzureOpenAI = AsyncOpenAI = AsyncAzureOpenAI = None  # type: ignore
+
+try:  # HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+    import httpx  # type: ignore
+    import h2  # type: ignore  # noqa: F401
+except ImportError:
+    httpx = None  # type: ignore
 
 _client = None
+_async_client = None
+_async_client_loop = None
+
+# Last rate-limit headers reported by the embeddings endpoint (None until the first call).
+_rate_limit_state = {"remaining_tokens": None}
+
+# Most inputs the embeddings endpoint accepts in one request (text-embedding-3 models)
+_MAX_INPUTS_PER_REQUEST = 2048
+
+# Request-rate bucket shared by every bulk caller in the process (threads and coroutines)
+_request_limiter = TokenBucket(EMBED_REQUESTS_PER_MIN, burst=max(1, EMBED_CONCURRENCY))
+
+# Input-token bucket drawn by every embeddings call (bulk batches and single queries alike)
+_token_limiter = TokenBucket(EMBED_TOKENS_PER_MIN)
+
+def _http_client_kwargs(use_async: bool = False) -> dict:
+    """Return ``http_client=`` for the OpenAI constructors, or nothing to keep the SDK default."""
+    if not (EMBED_HTTP2 and httpx):
+        return {}
+    pool = max(1, EMBED_CONCURRENCY) * 2
+    client_cls = httpx.AsyncClient if use_async else httpx.Client
+    return {
+        "http_client": client_cls(
+            http2=True,
+            limits=httpx.Limits(max_connections=pool, max_keepalive_connections=pool),
+            timeout=60,
+        )
+    }
+
 
 def get_client():
     """Return a singleton embedding client.
@@ -28,6 +86,9 @@ def get_client():
     2. Else if AZURE_OPENAI_API_KEY + AZURE_OPENAI_ENDPOINT -> use AzureOpenAI.
     3. Else if EMBED_ZERO_ON_MISSING=1 -> return a dummy sentinel to trigger zero-vector fallback.
     4. Else raise a clear credential error.
+
+    When EMBED_HTTP2 is on and h2 is installed, the client runs over an HTTP/2
+    connection pool so concurrent batches share one TLS connection.
     """
     global _client
     if _client is not None:
@@ -39,10 +100,12 @@ def get_client():
     api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-08-01-preview")
 
     if openai_key and OpenAI:
-        _client = OpenAI(api_key=openai_key)
+        _client = OpenAI(api_key=openai_key, **_http_client_kwargs())
         return _client
     if az_key and az_ep and AzureOpenAI:
-        _client = AzureOpenAI(api_key=az_key, azure_endpoint=az_ep, api_version=api_version)
+        _client = AzureOpenAI(
+            api_key=az_key, azure_endpoint=az_ep, api_version=api_version, **_http_client_kwargs()
+        )
         return _client
 
     if os.getenv("EMBED_ZERO_ON_MISSING", "0") == "1":
@@ -58,6 +121,61 @@ def get_client():
     )
 
 
+def _get_async_client():
+    """Return one async embedding client per event loop, or None in zero-vector mode.
+
+    Follows the same resolution order as `get_client`; raises the same
+    credential error when nothing is configured.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is not None and _async_client_loop is loop:
+        return _async_client
+
+    openai_key = os.getenv("OPENAI_API_KEY")
+    az_key = os.getenv("AZURE_OPENAI_API_KEY")
+    az_ep = os.getenv("AZURE_OPENAI_ENDPOINT")
+    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-08-01-preview")
+
+    if openai_key and AsyncOpenAI:
+        _async_client = AsyncOpenAI(api_key=openai_key, **_http_client_kwargs(use_async=True))
+    elif az_key and az_ep and AsyncAzureOpenAI:
+        _async_client = AsyncAzureOpenAI(
+            api_key=az_key, azure_endpoint=az_ep, api_version=api_version, **_http_client_kwargs(use_async=True)
+        )
+    else:
+        get_client()  # raises the credential error unless EMBED_ZERO_ON_MISSING=1
+        return None
+    _async_client_loop = loop
+    return _async_client
+
+
+def _retry_delay(error: Exception, attempt: int, max_retries: int) -> Optional[float]:
+    """Log a failed embeddings call and return how long to wait before retrying (None = give up)."""
+    error_str = str(error).lower()
+
+    # Handle rate limit errors (429) with exponential backoff
+    if "429" in error_str or "rate limit" in error_str or "too many requests" in error_str:
+        if attempt < max_retries - 1:  # Don't sleep on final attempt
+            # Prefer the server's Retry-After; else exponential backoff: 2^attempt + jitter, capped at 60s
+            delay = _retry_after_seconds(error)
+            if delay is None:
+                delay = min(2 ** attempt + random.uniform(0, 1), 60)
+            print(f"[embeddings] Rate limit hit (attempt {attempt + 1}/{max_retries}), waiting {delay:.1f}s...")
+            return delay
+        print(f"[embeddings] Rate limit exceeded after {max_retries} attempts")
+        return None
+
+    # Handle other errors with shorter backoff
+    if attempt < max_retries - 1:
+        delay = min(2 ** attempt, 10)  # Shorter backoff for other errors
+        print(f"[embeddings] Error (attempt {attempt + 1}/{max_retries}): {error}")
+        print(f"[embeddings] Retrying in {delay:.1f}s...")
+        return delay
+    print(f"[embeddings] Failed after {max_retries} attempts: {error}")
+    return None
+
+
 def get_embeddings_batch(texts: Sequence[str], model: str = AOAI_EMBED_MODEL, max_retries: int = 5) -> List[List[float]]:
     if not texts:
         return []
@@ -72,43 +190,226 @@ def get_embeddings_batch(texts: Sequence[str], model: str = AOAI_EMBED_MODEL, ma
     if client.__class__.__name__ == '_Dummy':  # type: ignore
         return [[0.0] * EMBED_DIM_FALLBACK for _ in texts]
 
+    # Reserve the batch's estimated tokens up front; waits only when over budget
+    _token_limiter.acquire_blocking(_estimate_tokens(texts))
+
     # Robust retry with exponential backoff for rate limits
     for attempt in range(max_retries):
         try:
-            resp = client.embeddings.create(input=list(texts), model=model)
-            return [d.embedding for d in resp.data]
+            raw = client.embeddings.with_raw_response.create(input=list(texts), model=model, **_CREATE_KWARGS)
+            _record_rate_limit(raw.headers)
+            resp = raw.parse()
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
         except Exception as e:
-            error_str = str(e).lower()
-            
-            # Handle rate limit errors (429) with exponential backoff
-            if "429" in error_str or "rate limit" in error_str or "too many requests" in error_str:
-                if attempt < max_retries - 1:  # Don't sleep on final attempt
-                    # Exponential backoff: 2^attempt + jitter, capped at 60s
-                    delay = min(2 ** attempt + random.uniform(0, 1), 60)
-                    print(f"[embeddings] Rate limit hit (attempt {attempt + 1}/{max_retries}), waiting {delay:.1f}s...")
-                    time.sleep(delay)
-                    continue
-                else:
-                    print(f"[embeddings] Rate limit exceeded after {max_retries} attempts")
-            
-            # Handle other errors with shorter backoff
-            elif attempt < max_retries - 1:
-                delay = min(2 ** attempt, 10)  # Shorter backoff for other errors
-                print(f"[embeddings] Error (attempt {attempt + 1}/{max_retries}): {e}")
-                print(f"[embeddings] Retrying in {delay:.1f}s...")
-                time.sleep(delay)
-                continue
-            else:
-                print(f"[embeddings] Failed after {max_retries} attempts: {e}")
-            
-        # If we reach here, all retries failed
+            delay = _retry_delay(e, attempt, max_retries)
+            if delay is None:
+                break
+            time.sleep(delay)
+
+    # All retries failed
+    return [[0.0] * EMBED_DIM_FALLBACK for _ in texts]
+
+
+async def aget_embeddings_batch(texts: Sequence[str], model: str = AOAI_EMBED_MODEL, max_retries: int = 5) -> List[List[float]]:
+    """Async counterpart of `get_embeddings_batch` with the same retry and zero-vector fallback."""
+    if not texts:
+        return []
+    try:
+        client = _get_async_client()
+    except RuntimeError as cred_err:
+        print(f"[embeddings] credential error: {cred_err}")
         return [[0.0] * EMBED_DIM_FALLBACK for _ in texts]
-    
-    # Fallback (shouldn't reach here)
+    if client is None:
+        return [[0.0] * EMBED_DIM_FALLBACK for _ in texts]
+
+    await _token_limiter.acquire(_estimate_tokens(texts))
+
+    for attempt in range(max_retries):
+        try:
+            raw = await client.embeddings.with_raw_response.create(input=list(texts), model=model, **_CREATE_KWARGS)
+            _record_rate_limit(raw.headers)
+            resp = raw.parse()
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+        except Exception as e:
+            delay = _retry_delay(e, attempt, max_retries)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+
     return [[0.0] * EMBED_DIM_FALLBACK for _ in texts]
 
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read Retry-After (or retry-after-ms) from a 429 raised by the OpenAI SDK."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return min(float(headers["retry-after-ms"]) / 1000.0, 60.0)
+        if headers.get("retry-after"):
+            return min(float(headers["retry-after"]), 60.0)
+    except ValueError:
+        pass
+    return None
+
+
+def _record_rate_limit(headers) -> None:
+    remaining = headers.get("x-ratelimit-remaining-tokens")
+    try:
+        _rate_limit_state["remaining_tokens"] = int(remaining) if remaining is not None else None
+    except ValueError:
+        _rate_limit_state["remaining_tokens"] = None
+
+
+def _estimate_tokens(texts: Sequence[str]) -> int:
+    # ~4 characters per token is close enough for pacing decisions
+    return sum(len(t) for t in texts) // 4 + 1
+
+
+def _pace_delay(tokens_needed: int) -> float:
+    """Seconds to wait when the last response said the next batch would exceed the token budget."""
+    remaining = _rate_limit_state["remaining_tokens"]
+    if remaining is None or remaining >= tokens_needed:
+        return 0.0
+    delay = min((tokens_needed - remaining) / max(EMBED_TOKENS_PER_MIN, 1) * 60.0, 60.0)
+    print(f"[embeddings] Token budget low ({remaining} remaining), pausing {delay:.1f}s...")
+    return delay
+
+
+def _embed_batch(idx: List[int], batch: List[str], model: str) -> Tuple[List[int], List[str], np.ndarray]:
+    _request_limiter.acquire_blocking()
+    delay = _pace_delay(_estimate_tokens(batch))
+    if delay:
+        time.sleep(delay)
+    return idx, batch, np.asarray(get_embeddings_batch(batch, model), dtype=np.float32)
+
+
+async def _aembed_batch(
+    idx: List[int], batch: List[str], model: str, semaphore: asyncio.Semaphore
+) -> Tuple[List[int], List[str], np.ndarray]:
+    async with semaphore:
+        await _request_limiter.acquire()
+        delay = _pace_delay(_estimate_tokens(batch))
+        if delay:
+            await asyncio.sleep(delay)
+        return idx, batch, np.asarray(await aget_embeddings_batch(batch, model), dtype=np.float32)
+
+
+def _dedupe(texts: List[str]) -> Tuple[List[str], Optional[np.ndarray]]:
+    """Return the distinct texts in first-seen order and, if any repeat, the row map back to ``texts``."""
+    positions: dict = {}
+    inverse = [positions.setdefault(t, len(positions)) for t in texts]
+    if len(positions) == len(texts):
+        return texts, None
+    print(f"[embeddings] {len(texts) - len(positions)} duplicate texts embedded once")
+    return list(positions), np.asarray(inverse, dtype=np.intp)
+
+
+def _cached_rows(texts: List[str], model: str, use_cache: bool) -> Tuple[Optional[np.ndarray], List[int]]:
+    """Return the output matrix prefilled with cache hits (None if no hits) and the miss positions."""
+    if not use_cache:
+        return None, list(range(len(texts)))
+    hits, missed = embed_cache.get_cached(texts, model)
+    misses = [i for i, _ in missed]
+    if not hits:
+        return None, misses
+    print(f"[embeddings] {len(hits)}/{len(texts)} texts served from cache")
+    out = np.empty((len(texts), len(next(iter(hits.values())))), dtype=np.float32)
+    for i, vec in hits.items():
+        out[i] = vec
+    return out, misses
+
+
+def embed_texts(
+    texts: Sequence[str],
+    model: str = AOAI_EMBED_MODEL,
+    batch_size: int = EMBED_BATCH_SIZE,
+    use_cache: bool = EMBED_CACHE_ENABLED,
+    max_workers: int = EMBED_CONCURRENCY,
+) -> np.ndarray:
+    """Embed ``texts`` in batches and return a ``(len(texts), dim)`` float32 matrix.
+
+    Each batch is a single multi-input request, and up to ``max_workers``
+    requests are in flight at once; rows land at their original positions
+    regardless of completion order. Instead of a fixed delay between batches,
+    requests draw from a shared EMBED_REQUESTS_PER_MIN token bucket, reserve
+    their estimated input tokens from an EMBED_TOKENS_PER_MIN bucket, and also
+    wait when ``x-ratelimit-remaining-tokens`` from a previous response is lower
+    than the estimated size of the next batch.
+    Repeated texts are sent once and their vector is copied to every position.
+    With ``use_cache`` texts already present in the on-disk embedding cache are
+    not sent to the API, so re-runs over unchanged chunks skip this step.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, EMBED_DIM_FALLBACK), dtype=np.float32)
+    texts, inverse = _dedupe(texts)
+    batch_size = max(1, min(batch_size, _MAX_INPUTS_PER_REQUEST))
+
+    # Rows are written straight into one preallocated matrix (sized on the first
+    # vector seen) so no list-of-lists of Python floats is accumulated.
+    out, misses = _cached_rows(texts, model, use_cache)
+
+    total_batches = (len(misses) + batch_size - 1) // batch_size
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = []
+        for b in range(0, len(misses), batch_size):
+            idx = misses[b:b + batch_size]
+            futures.append(executor.submit(_embed_batch, idx, [texts[i] for i in idx], model))
+        for done, future in enumerate(as_completed(futures), 1):
+            idx, batch, vecs = future.result()
+            if out is None:
+                out = np.empty((len(texts), vecs.shape[1]), dtype=np.float32)
+            out[idx] = vecs
+            if use_cache:
+                embed_cache.store(batch, vecs, model)
+            print(f"[embeddings] Completed batch {done}/{total_batches}")
+
+    return out if inverse is None else out[inverse]
+
+
+async def aembed_texts(
+    texts: Sequence[str],
+    model: str = AOAI_EMBED_MODEL,
+    batch_size: int = EMBED_BATCH_SIZE,
+    use_cache: bool = EMBED_CACHE_ENABLED,
+    max_concurrency: int = EMBED_CONCURRENCY,
+) -> np.ndarray:
+    """Async version of `embed_texts`.
+
+    All batches are scheduled at once with ``asyncio.gather`` and a semaphore
+    keeps at most ``max_concurrency`` requests in flight. Output order, pacing
+    and caching behave exactly as in `embed_texts`.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, EMBED_DIM_FALLBACK), dtype=np.float32)
+    texts, inverse = _dedupe(texts)
+    batch_size = max(1, min(batch_size, _MAX_INPUTS_PER_REQUEST))
+
+    out, misses = _cached_rows(texts, model, use_cache)
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    batches = [misses[b:b + batch_size] for b in range(0, len(misses), batch_size)]
+    done = 0
+
+    async def run(idx: List[int]) -> None:
+        nonlocal out, done
+        idx, batch, vecs = await _aembed_batch(idx, [texts[i] for i in idx], model, semaphore)
+        if out is None:
+            out = np.empty((len(texts), vecs.shape[1]), dtype=np.float32)
+        out[idx] = vecs
+        if use_cache:
+            embed_cache.store(batch, vecs, model)
+        done += 1
+        print(f"[embeddings] Completed batch {done}/{len(batches)}")
+
+    await asyncio.gather(*(run(idx) for idx in batches))
+    return out if inverse is None else out[inverse]
+
 def generate_embeddings(texts: Sequence[str], model: str = AOAI_EMBED_MODEL) -> List[List[float]]:
     """Alias for get_embeddings_batch for compatibility with existing pipeline code."""
     return get_embeddings_batch(texts, model)
 
-__all__ = ["get_embeddings_batch", "generate_embeddings"]
+__all__ = ["get_embeddings_batch", "aget_embeddings_batch", "generate_embeddings", "embed_texts", "aembed_texts"]
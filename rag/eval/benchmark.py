@@ -4,19 +4,31 @@ from typing import List, Dict, Any, Callable
 from time import perf_counter
 import numpy as np
 
-from .metrics import term_match_relevance, aggregate_retrieval_metrics
+from .metrics import term_match_relevances, aggregate_retrieval_metrics, metric_matrix
 
 __all__ = [
     "evaluate_query_results",
     "run_retrieval_benchmark",
 ]
 
+def _prep_results(results: List[Dict]) -> None:
+    """Store each result's lowercased header + chunk text under ``_lower`` (once per result)."""
+    for r in results:
+        if "_lower" not in r:
+            r["_lower"] = f"{r.get('ctx_header','')} {r.get('raw_chunk','')}".lower()
+
 def evaluate_query_results(query_data: Dict, results: List[Dict], top_k: int = 5) -> Dict[str, Any]:
+    """Score ``results`` against one query's expected terms.
+
+    The lowered text of each result is cached on the result dict as
+    ``_lower``, so scoring the same results against further queries does
+    not lowercase them again.
+    """
     expected_terms = query_data.get("expected_terms", [])
-    relevance_scores = []
-    for r in results[:top_k]:
-        combined = f"{r.get('ctx_header','')} {r.get('raw_chunk','')}"
-        relevance_scores.append(term_match_relevance(combined, expected_terms))
+    _prep_results(results[:top_k])
+    relevance_scores = term_match_relevances(
+        [r["_lower"] for r in results[:top_k]], expected_terms, lowered=True
+    )
     evaluation = {
         "query": query_data["query"],
         "category": query_data.get("category", "uncategorized"),
@@ -34,26 +46,37 @@ def evaluate_query_results(query_data: Dict, results: List[Dict], top_k: int = 5
 def run_retrieval_benchmark(queries: List[Dict], retriever, top_k: int = 5, progress: Callable[[int,int,str], None] | None = None):
     evaluations = []
     start = perf_counter()
-    for i, qd in enumerate(queries, 1):
-        results = retriever.search(qd["query"], top_k=top_k)
+    # Retrievers with search_batch embed the queries in batched requests and
+    # search them as one matrix; others are searched one query at a time
+    if hasattr(retriever, "search_batch"):
+        all_results = retriever.search_batch([qd["query"] for qd in queries], top_k=top_k)
+    else:
+        all_results = (retriever.search(qd["query"], top_k=top_k) for qd in queries)
+    for i, (qd, results) in enumerate(zip(queries, all_results), 1):
         eval_row = evaluate_query_results(qd, results, top_k)
         evaluations.append(eval_row)
+        for r in results:  # results are per-query here; drop the cached text
+            r.pop("_lower", None)
         if progress:
             progress(i, len(queries), qd["query"])
     elapsed = perf_counter() - start
     aggregates = aggregate_retrieval_metrics(evaluations)
     aggregates["benchmark_time_seconds"] = elapsed
     aggregates["avg_time_per_query"] = elapsed / len(queries) if queries else 0.0
-    # Category breakdown
+    # Category breakdown: per-category column sums of the metric matrix
     categories = {}
-    for cat in {e["category"] for e in evaluations}:
-        cat_evals = [e for e in evaluations if e["category"] == cat]
-        categories[cat] = {
-            "count": len(cat_evals),
-            "avg_relevance": float(np.mean([e["avg_relevance"] for e in cat_evals])),
-            "avg_max_relevance": float(np.mean([e["max_relevance"] for e in cat_evals])),
-            "percent_relevant": float(np.mean([e["has_relevant_result"] for e in cat_evals]) * 100),
-        }
+    if evaluations:
+        names, group = np.unique([e["category"] for e in evaluations], return_inverse=True)
+        counts = np.bincount(group)
+        matrix = metric_matrix(evaluations)
+        sums = {col: np.bincount(group, weights=matrix[:, col]) for col in (0, 1, 4)}
+        for g, cat in enumerate(names.tolist()):
+            categories[cat] = {
+                "count": int(counts[g]),
+                "avg_relevance": float(sums[0][g] / counts[g]),
+                "avg_max_relevance": float(sums[1][g] / counts[g]),
+                "percent_relevant": float(sums[4][g] / counts[g] * 100),
+            }
     return {
         "aggregate_metrics": aggregates,
         "category_metrics": categories,
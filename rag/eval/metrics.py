@@ -3,28 +3,87 @@ from __future__ import annotations
 from typing import List, Dict, Sequence
 import numpy as np
 
+try:
+    import ahocorasick  # type: ignore  # optional: one pass per text instead of one scan per term
+except ImportError:
+    ahocorasick = None
+
 __all__ = [
     "term_match_relevance",
+    "term_match_relevances",
     "aggregate_retrieval_metrics",
+    "metric_matrix",
 ]
 
 def term_match_relevance(text: str, expected_terms: Sequence[str]) -> float:
+    return term_match_relevances([text], expected_terms)[0]
+
+def term_match_relevances(texts: Sequence[str], expected_terms: Sequence[str], lowered: bool = False) -> List[float]:
+    """`term_match_relevance` for several texts, lowering each term once rather than per text.
+
+    Pass ``lowered=True`` when ``texts`` are already lowercase to skip that pass.
+    """
     if not expected_terms:
-        return 0.0
-    lower = text.lower()
-    matches = sum(1 for t in expected_terms if t.lower() in lower)
-    return matches / len(expected_terms)
+        return [0.0] * len(texts)
+    terms = [t.lower() for t in expected_terms]
+    n = len(terms)
+    if ahocorasick is not None:
+        return [m.bit_count() / n for m in _term_match_masks(texts, terms, lowered)]
+    scores = []
+    for text in texts:
+        lower = text if lowered else text.lower()
+        scores.append(sum(map(lower.__contains__, terms)) / n)
+    return scores
+
+def _term_match_masks(texts: Sequence[str], terms: Sequence[str], lowered: bool) -> List[int]:
+    """Bitmask per text of which ``terms`` occur in it (bit i set for ``terms[i]``).
+
+    One Aho-Corasick automaton over the terms is built per call and every text
+    is scanned once; each hit ORs its term bits into the mask, so repeated
+    occurrences of a term cost nothing extra. Duplicate terms share a keyword and
+    set all of their bits; empty terms match every text, as ``"" in text`` does.
+    """
+    automaton = ahocorasick.Automaton()
+    always = 0
+    bits: Dict[str, int] = {}
+    for i, term in enumerate(terms):
+        if term:
+            bits[term] = bits.get(term, 0) | (1 << i)
+        else:
+            always |= 1 << i
+    for term, mask in bits.items():
+        automaton.add_word(term, mask)
+    if not bits:
+        return [always] * len(texts)
+    automaton.make_automaton()
+    masks = []
+    for text in texts:
+        mask = always
+        for _, hit in automaton.iter(text if lowered else text.lower()):
+            mask |= hit
+        masks.append(mask)
+    return masks
+
+# Per-query evaluation fields reduced by the aggregates, in matrix column order
+_METRIC_FIELDS = (
+    "avg_relevance", "max_relevance", "precision_at_1",
+    "top_3_avg_relevance", "has_relevant_result", "avg_similarity_score",
+)
+
+def metric_matrix(evaluations: Sequence[Dict]) -> np.ndarray:
+    """(N, 6) float64 array of `_METRIC_FIELDS` per evaluation, built in one pass."""
+    return np.array([[e[f] for f in _METRIC_FIELDS] for e in evaluations], dtype=np.float64).reshape(-1, len(_METRIC_FIELDS))
 
 def aggregate_retrieval_metrics(evaluations: List[Dict]):
     if not evaluations:
         return {}
-    avg_relevance_overall = float(np.mean([e["avg_relevance"] for e in evaluations])) if evaluations else 0.0
+    avg, max_rel, p1, top3, has_rel, sim = metric_matrix(evaluations).mean(axis=0).tolist()
     return {
         "total_queries": len(evaluations),
-        "avg_relevance_overall": avg_relevance_overall,
-        "avg_max_relevance": float(np.mean([e["max_relevance"] for e in evaluations])),
-        "avg_precision_at_1": float(np.mean([e["precision_at_1"] for e in evaluations])),
-        "avg_top_3_relevance": float(np.mean([e["top_3_avg_relevance"] for e in evaluations])),
-        "percent_with_relevant_results": float(np.mean([e["has_relevant_result"] for e in evaluations]) * 100),
-        "avg_similarity_score": float(np.mean([e["avg_similarity_score"] for e in evaluations])),
+        "avg_relevance_overall": avg,
+        "avg_max_relevance": max_rel,
+        "avg_precision_at_1": p1,
+        "avg_top_3_relevance": top3,
+        "percent_with_relevant_results": has_rel * 100,
+        "avg_similarity_score": sim,
     }
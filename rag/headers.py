@@ -8,6 +8,8 @@ Design choices:
 - Dependency injection for LLM call (`llm` coroutine) to allow testing.
 - Simple token request rate limiter (dual buckets: requests + tokens).
 - Document-level summary caching option placeholder (future optimization).
+- Completions from the default Azure adapter are cached on disk by prompt hash
+  (`rag.llm_cache`), so unchanged chunks skip both the rate limiter and the API.
 """
 from __future__ import annotations
 import asyncio
@@ -18,6 +20,7 @@ from typing import Iterable, List, Dict, Callable, Awaitable, Optional
 import re, collections, os
 
 from .models import Document, Chunk
+from . import llm_cache
 from .chunking import split_by_semantic_boundaries
 from .config import (
     REQUESTS_PER_MIN,
@@ -27,6 +30,10 @@ from .config import (
     BATCH_SIZE,
     HEADER_MAX_CHARS,
     SEMANTIC_MAX_WORDS,
+    AZURE_OPENAI_API_KEY,
+    AZURE_OPENAI_ENDPOINT,
+    AOAI_CHAT_MODEL,
+    LLM_CACHE_ENABLED,
 )
 
 # -------- Rate Limiter ---------
@@ -149,42 +156,60 @@ def _slice_for_header(text: str) -> str:
     return head + " ... " + tail
 
 # -------- Core Logic ---------
+def _build_messages(chunk_payload: Dict) -> List[Dict]:
+    if ADVANCED_STYLE:
+        surrounding_parts = []
+        prev_snip = chunk_payload.get("prev_text", "")[:NEIGHBOR_SNIP_CHARS]
+        next_snip = chunk_payload.get("next_text", "")[:NEIGHBOR_SNIP_CHARS]
+        if prev_snip:
+            surrounding_parts.append(f"<prev>{prev_snip}</prev>")
+        if next_snip:
+            surrounding_parts.append(f"<next>{next_snip}</next>")
+        surrounding = "\n".join(surrounding_parts)
+        content = DOCUMENT_CONTEXT_PROMPT.format(
+            doc_title=chunk_payload.get("doc_title",""),
+            doc_summary=chunk_payload.get("doc_summary",""),
+            keywords=chunk_payload.get("keywords",""),
+            position_info=chunk_payload.get("position",""),
+        ) + "\n" + CHUNK_CONTEXT_PROMPT.format(chunk_content=_slice_for_header(chunk_payload["text"]), surrounding=surrounding)
+    else:
+        content = f"<document>{chunk_payload['doc_content']}</document>\n<chunk>{_slice_for_header(chunk_payload['text'])}</chunk>\nProvide a concise context phrase."  # legacy simplified
+    return [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "user", "content": content},
+    ]
+
+def _clean_header(header: str) -> str:
+    header = header.replace("\n", " ").strip()
+    if len(header) > HEADER_MAX_CHARS:
+        header = header[: HEADER_MAX_CHARS - 3].rstrip() + "..."
+    return header
+
 async def _generate_header(llm: Callable[[List[Dict]], Awaitable[str]], chunk_payload: Dict, limiter: AsyncRateLimiter, retries: int = 4):
+    messages = _build_messages(chunk_payload)
+
+    # Only the built-in adapter has a known model/params to key on; injected llms are never cached
+    cache_key = None
+    if LLM_CACHE_ENABLED and llm is azure_chat_completion:
+        cache_key = llm_cache.prompt_key(AOAI_CHAT_MODEL, messages, max_completion_tokens=CHAT_MAX_COMPLETION_TOKENS)
+        cached = llm_cache.get(cache_key)
+        if cached:
+            return _clean_header(cached)
+
     attempt = 0
     last_error = None
     while attempt < retries:
         await limiter.acquire()
         try:
-            if ADVANCED_STYLE:
-                surrounding_parts = []
-                prev_snip = chunk_payload.get("prev_text", "")[:NEIGHBOR_SNIP_CHARS]
-                next_snip = chunk_payload.get("next_text", "")[:NEIGHBOR_SNIP_CHARS]
-                if prev_snip:
-                    surrounding_parts.append(f"<prev>{prev_snip}</prev>")
-                if next_snip:
-                    surrounding_parts.append(f"<next>{next_snip}</next>")
-                surrounding = "\n".join(surrounding_parts)
-                content = DOCUMENT_CONTEXT_PROMPT.format(
-                    doc_title=chunk_payload.get("doc_title",""),
-                    doc_summary=chunk_payload.get("doc_summary",""),
-                    keywords=chunk_payload.get("keywords",""),
-                    position_info=chunk_payload.get("position",""),
-                ) + "\n" + CHUNK_CONTEXT_PROMPT.format(chunk_content=_slice_for_header(chunk_payload["text"]), surrounding=surrounding)
-            else:
-                content = f"<document>{chunk_payload['doc_content']}</document>\n<chunk>{_slice_for_header(chunk_payload['text'])}</chunk>\nProvide a concise context phrase."  # legacy simplified
-            messages = [
-                {"role": "system", "content": SYSTEM_MESSAGE},
-                {"role": "user", "content": content},
-            ]
-            header = await llm(messages)
-            header = header.replace("\n", " ").strip()
+            raw = await llm(messages)
+            header = _clean_header(raw)
 
             # If LLM returned empty/whitespace, treat as failure and retry
             if not header:
                 raise ValueError("LLM returned empty header")
 
-            if len(header) > HEADER_MAX_CHARS:
-                header = header[: HEADER_MAX_CHARS - 3].rstrip() + "..."
+            if cache_key:
+                llm_cache.put(cache_key, raw)
             return header
         except Exception as e:  # pragma: no cover - network variability
             last_error = e
@@ -221,7 +246,10 @@ async def generate_headers(
     batch_size : int
         Number of coroutine tasks to gather per await (throttles memory / progress cadence).
     max_concurrent : int
-        Upper bound on simultaneous in-flight LLM requests.
+        Upper bound on simultaneous in-flight LLM requests (MAX_CONCURRENT).
+        Requests also draw from the RPM/TPM limiter, so this only caps overlap
+        of request latency. Chunks are returned in input order regardless of
+        completion order.
     progress_callback : callable(phase, done, total, pct, rate, eta)
         Optional progress reporter. Phases: 'prepare', 'headers'.
     use_tqdm : bool
@@ -229,7 +257,9 @@ async def generate_headers(
     """
     limiter = AsyncRateLimiter(REQUESTS_PER_MIN, TOKENS_PER_MIN, EST_TOKENS_PER_REQUEST)
     semaphore = asyncio.Semaphore(max_concurrent)
-    chunks_out: List[Chunk] = []
+    # One slot per chunk, filled as requests finish, so output keeps document/chunk order
+    chunks_out: List[Optional[Chunk]] = []
+    completed = 0
 
     # Optional tqdm setup
     tqdm_prepare = tqdm_headers = None
@@ -266,7 +296,9 @@ async def generate_headers(
                     info["next_text"] = semantic_chunks[i+1]['text']
             info["doc_content"] = doc.content[:30000]
             payload = dict(info)
-            async def run_one(doc_ref=doc, idx=i, payload_ref=payload):
+            chunks_out.append(None)
+            async def run_one(doc_ref=doc, idx=i, payload_ref=payload, slot=len(chunks_out) - 1):
+                nonlocal completed
                 async with semaphore:
                     header = await _generate_header(llm, payload_ref, limiter)
                     augmented = f"{header}\n\n{payload_ref['text']}"
@@ -283,7 +315,8 @@ async def generate_headers(
                         source_url=doc_ref.source_url,
                         pub_date=doc_ref.pub_date,
                     )
-                    chunks_out.append(chunk)
+                    chunks_out[slot] = chunk
+                    completed += 1
             tasks.append(run_one())
             total_chunks += 1
         doc_index += 1
@@ -344,7 +377,7 @@ async def generate_headers(
         if len(pending) < BATCH_SLICE:
             await consume_slice()
         # Update progress once per completion group
-        done = len(chunks_out)
+        done = completed
         now = time.time()
         elapsed = now - start_time
         rate = done / elapsed if elapsed > 0 else 0.0
@@ -365,19 +398,32 @@ async def generate_headers(
 
     if tqdm_headers:
         tqdm_headers.close()
-    return chunks_out
+    return [c for c in chunks_out if c is not None]
 
 # -------- Example LLM adapter (async) ---------
+# Use higher token limit for reasoning models like gpt-5-mini that use tokens for internal reasoning
+# Increased from 500 to 800 to handle longer contextual headers
+CHAT_MAX_COMPLETION_TOKENS = 800
+
+_chat_client = None
+_chat_client_loop = None
+
+def _get_chat_client():
+    """Return one AsyncAzureOpenAI client per event loop so its connection pool is reused across chunks."""
+    global _chat_client, _chat_client_loop
+    loop = asyncio.get_running_loop()
+    if _chat_client is None or _chat_client_loop is not loop:
+        from openai import AsyncAzureOpenAI  # type: ignore
+        _chat_client = AsyncAzureOpenAI(api_key=AZURE_OPENAI_API_KEY, azure_endpoint=AZURE_OPENAI_ENDPOINT, api_version="2024-08-01-preview")
+        _chat_client_loop = loop
+    return _chat_client
+
 async def azure_chat_completion(messages: List[Dict], model: str | None = None):  # placeholder; real impl in separate llm module later
-    from openai import AsyncAzureOpenAI  # type: ignore
-    from .config import AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT, AOAI_CHAT_MODEL
-    client = AsyncAzureOpenAI(api_key=AZURE_OPENAI_API_KEY, azure_endpoint=AZURE_OPENAI_ENDPOINT, api_version="2024-08-01-preview")
-    # Use higher token limit for reasoning models like gpt-5-mini that use tokens for internal reasoning
-    # Increased from 500 to 800 to handle longer contextual headers
+    client = _get_chat_client()
     resp = await client.chat.completions.create(
         model=model or AOAI_CHAT_MODEL,
         messages=messages,
-        max_completion_tokens=800
+        max_completion_tokens=CHAT_MAX_COMPLETION_TOKENS
     )
     content = resp.choices[0].message.content
     return content.strip() if content else ""
@@ -1,14 +1,70 @@
 """FAISS index building and persistence helpers."""
 from __future__ import annotations
-from typing import List
+from typing import List, Optional, Union
+import os
+import tempfile
+from pathlib import Path
 import numpy as np
 import faiss  # type: ignore
 
-from .config import EMBED_DIM_FALLBACK
+from .config import (
+    EMBED_DIM_FALLBACK,
+    FAISS_HNSW_EF_CONSTRUCTION,
+    FAISS_HNSW_EF_SEARCH,
+    FAISS_HNSW_M,
+    FAISS_INDEX_TYPE,
+)
 
+_FLAT_MAX = 1000  # auto: brute-force (int8 scalar-quantized) scan up to this many vectors
+_SQ_MIN_TRAIN = 256  # fewer vectors than this train a poor quantizer; stay float32
+_HNSW_MAX = 100_000  # auto: HNSW graph up to this many, IVF-PQ above
+_PQ_BITS = 8
+_PQ_MIN_TRAIN = 1 << _PQ_BITS  # k-means needs at least one point per PQ centroid
 
-def build_faiss_index(embeddings: List[List[float]], index_type: str = "auto") -> faiss.Index:
-    arr = np.asarray(embeddings, dtype=np.float32)
+
+def _auto_index_type(n: int) -> str:
+    if n <= _FLAT_MAX:
+        return "sq8"
+    return "hnsw" if n <= _HNSW_MAX else "ivfpq"
+
+
+def _pq_subquantizers(d: int) -> int:
+    """Largest divisor of ``d`` giving sub-vectors of at least 32 dims (96 for 3072)."""
+    target = max(1, d // 32)
+    return next(m for m in range(target, 0, -1) if d % m == 0)
+
+
+def build_faiss_index(
+    embeddings: Union[np.ndarray, List[List[float]]],
+    index_type: str = "auto",
+    m: int = FAISS_HNSW_M,
+    ef_construction: int = FAISS_HNSW_EF_CONSTRUCTION,
+    ef_search: int = FAISS_HNSW_EF_SEARCH,
+) -> faiss.Index:
+    """Build a FAISS inner-product index over L2-normalized embeddings.
+
+    The input is copied once into a float32 matrix and that copy is
+    normalized, so the caller's array (possibly a read-only memmap from
+    `rag.cache.load_embeddings`) is never modified; pass the matrix rather
+    than ``.tolist()``.
+
+    ``index_type="auto"`` uses FAISS_INDEX_TYPE, or when that is also
+    ``auto`` picks by corpus size: a brute-force ``sq8`` scan up to 1k
+    vectors, ``hnsw`` up to 100k and ``ivfpq`` above.
+
+    ``index_type="sq8"`` keeps one int8 code per dimension (a quarter of the
+    float32 bytes scanned per query; queries stay float32), falling back to
+    exact ``flat`` below 256 vectors.
+
+    ``index_type="hnsw"`` builds an ``IndexHNSWFlat`` graph (same algorithm as the
+    Azure AI Search index) using ``m`` links per node, ``ef_construction`` and
+    ``ef_search`` (defaults from FAISS_HNSW_*). ``hnsw_sq8`` builds the same
+    graph over int8 scalar-quantized codes (``IndexHNSWSQ``), a quarter of the
+    vector memory, falling back to ``hnsw`` below 256 vectors. ``ivf`` and ``ivfpq`` use ``sqrt(n)``-ish lists probed
+    ``max(8, nlist // 16)`` at a time; ``ivfpq`` stores 8-bit product-quantized
+    codes (~16x smaller than float32 at 32 dims per sub-vector).
+    """
+    arr = np.array(embeddings, dtype=np.float32, copy=True)
     if arr.ndim == 1:
         arr = arr.reshape(1, -1)
     if arr.size == 0:
@@ -17,26 +73,103 @@ def build_faiss_index(embeddings: List[List[float]], index_type: str = "auto") -
     if d == 0:
         d = EMBED_DIM_FALLBACK
     if index_type == "auto":
-        index_type = "ivf" if n > 1000 else "flat"
-    if index_type == "flat":
+        index_type = FAISS_INDEX_TYPE if FAISS_INDEX_TYPE != "auto" else _auto_index_type(n)
+    # Normalize before any training so IVF centroids live on the unit sphere
+    faiss.normalize_L2(arr)
+    if index_type == "hnsw_sq8" and n < _SQ_MIN_TRAIN:
+        index_type = "hnsw"
+    if index_type == "flat" or (index_type == "sq8" and n < _SQ_MIN_TRAIN):
         index = faiss.IndexFlatIP(d)
-    elif index_type == "ivf":
-        nlist = max(1, min(100, n // 10))
-        if n <= nlist:
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        index.train(arr)
+    elif index_type in ("ivf", "ivfpq"):
+        nlist = max(1, min(100, n // 10)) if index_type == "ivf" else max(1, int(np.sqrt(n)))
+        if n <= nlist or (index_type == "ivfpq" and n < max(nlist, _PQ_MIN_TRAIN)):
             index = faiss.IndexFlatIP(d)
         else:
             quantizer = faiss.IndexFlatIP(d)
-            index = faiss.IndexIVFFlat(quantizer, d, nlist)
+            if index_type == "ivf":
+                index = faiss.IndexIVFFlat(quantizer, d, nlist, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexIVFPQ(
+                    quantizer, d, nlist, _pq_subquantizers(d), _PQ_BITS, faiss.METRIC_INNER_PRODUCT
+                )
             index.train(arr)
+            index.nprobe = min(nlist, max(8, nlist // 16))
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(d, m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = ef_search
+    elif index_type == "hnsw_sq8":
+        index = faiss.IndexHNSWSQ(d, faiss.ScalarQuantizer.QT_8bit, m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = ef_search
+        index.train(arr)
     else:
         raise ValueError(f"Unknown index_type {index_type}")
-    faiss.normalize_L2(arr)
     index.add(arr)
     return index
 
 
-def search_index(index: faiss.Index, query_vec, top_k: int = 5):
-    scores, indices = index.search(query_vec, top_k)
+def search_params(
+    index: faiss.Index, top_k: int, exhaustive: bool = False
+) -> Optional[faiss.SearchParameters]:
+    """Per-query search parameters (None when the index's own settings apply).
+
+    HNSW gets an ``efSearch`` of at least ``4 * top_k``, so a deep ``top_k``
+    never runs with a candidate list shorter than the results it has to
+    return. With ``exhaustive`` an IVF index probes every list. Passed through
+    ``index.search(..., params=...)``, so the stored index is left untouched.
+    """
+    if isinstance(index, faiss.IndexIVF) and exhaustive:
+        return faiss.SearchParametersIVF(nprobe=index.nlist)
+    if not isinstance(index, faiss.IndexHNSW):
+        return None
+    return faiss.SearchParametersHNSW(efSearch=max(FAISS_HNSW_EF_SEARCH, index.hnsw.efSearch, 4 * top_k))
+
+
+def search_index(index: faiss.Index, query_vec, top_k: int = 5, exhaustive: bool = False):
+    """Top-``top_k`` inner-product search; ``exhaustive`` scores every stored vector.
+
+    The exhaustive path skips the graph of an HNSW index and scans its
+    storage (float32 or int8 codes) directly, and probes all lists of an IVF
+    index, so recall is exact up to quantization at brute-force cost. Flat
+    and ``sq8`` indexes are always exhaustive.
+    """
+    if exhaustive and isinstance(index, faiss.IndexHNSW):
+        return faiss.downcast_index(index.storage).search(query_vec, top_k)
+    scores, indices = index.search(query_vec, top_k, params=search_params(index, top_k, exhaustive))
     return scores, indices
 
-__all__ = ["build_faiss_index", "search_index"]
+def save_index(index: faiss.Index, path: Union[str, Path]) -> None:
+    """Write ``index`` to a temp file in the same directory, then rename over ``path``.
+
+    Replacing rather than rewriting matters once indexes are memory-mapped: a
+    running process keeps reading its old (now unlinked) file instead of
+    faulting on pages truncated underneath it.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+    os.close(fd)
+    try:
+        faiss.write_index(index, tmp_name)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    Path(tmp_name).replace(path)
+
+
+def load_index(path: Union[str, Path], mmap: bool = True) -> faiss.Index:
+    """Read an index written by `save_index`.
+
+    With ``mmap=True`` the vector/code arrays are mapped read-only and paged in
+    from disk as searches touch them, so a cold start costs no rebuild or full
+    copy and RSS grows only with the pages actually used. IVF indexes loaded
+    this way cannot be added to; rebuild them instead.
+    """
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+    return faiss.read_index(str(path), flags)
+
+__all__ = ["build_faiss_index", "search_index", "search_params", "save_index", "load_index"]
@@ -1,26 +1,59 @@
 """PDF and JSON document ingestion utilities."""
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+import mmap
+import os
 import uuid
 import json
 
+try:  # optional: faster JSON decoding
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
+try:  # optional: PDFium (C++) text extraction, much faster than the pure-Python readers
+    import pypdfium2 as pdfium  # type: ignore
+except ImportError:
+    pdfium = None
+
 try:
-    import PyPDF2
+    from pypdf import PdfReader  # type: ignore
 except ImportError:
-    PyPDF2 = None
+    try:
+        from PyPDF2 import PdfReader  # type: ignore
+    except ImportError:
+        PdfReader = None
 
 from .models import Document
 
+_MMAP_MIN_BYTES = 1 << 20  # JSON files this large are parsed from a memory map
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
-    """Extract text from a PDF file."""
-    if PyPDF2 is None:
-        raise ImportError("PyPDF2 is required for PDF extraction. Install with: pip install PyPDF2")
 
+def extract_text_from_pdf(pdf_path: Path) -> str:
+    """Extract text from a PDF file (pypdfium2 if installed, else pypdf/PyPDF2)."""
     text_parts = []
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                text = textpage.get_text_bounded()
+                # Release each page as we go so RSS stays flat on long documents
+                textpage.close()
+                page.close()
+                if text:
+                    text_parts.append(text)
+        finally:
+            pdf.close()
+        return "\n\n".join(text_parts)
+
+    if PdfReader is None:
+        raise ImportError("pypdfium2 or pypdf is required for PDF extraction. Install with: pip install pypdfium2")
+
     with open(pdf_path, 'rb') as f:
-        reader = PyPDF2.PdfReader(f)
+        reader = PdfReader(f)
         for page in reader.pages:
             text = page.extract_text()
             if text:
@@ -29,11 +62,15 @@ def extract_text_from_pdf(pdf_path: Path) -> str:
     return "\n\n".join(text_parts)
 
 
-def extract_text_from_pdfs(pdf_dir: Path) -> List[Document]:
+def extract_text_from_pdfs(pdf_dir: Path, max_workers: Optional[int] = None) -> List[Document]:
     """Extract text from all PDF files in a directory.
 
+    Files are extracted in parallel worker processes (one per CPU by
+    default); documents keep the directory's file order.
+
     Args:
         pdf_dir: Directory containing PDF files
+        max_workers: Worker processes (default: min(file count, CPU count)); 1 extracts in-process
 
     Returns:
         List of Document objects with extracted text
@@ -45,35 +82,73 @@ def extract_text_from_pdfs(pdf_dir: Path) -> List[Document]:
         print(f"No PDF files found in {pdf_dir}")
         return documents
 
-    for pdf_path in pdf_files:
-        try:
-            print(f"Extracting text from {pdf_path.name}...")
-            text = extract_text_from_pdf(pdf_path)
-
-            # Create document
-            doc = Document(
-                doc_id=uuid.uuid4().hex,
-                title=pdf_path.stem,  # Use filename without extension as title
-                content=text,
-                source_url=pdf_path.name,  # Just the filename, not full path
-                source_org="Uploaded PDF"
-            )
-
-            documents.append(doc)
-            print(f"  ✓ Extracted {len(text)} characters from {pdf_path.name}")
-
-        except Exception as e:
-            print(f"  ✗ Error extracting {pdf_path.name}: {str(e)}")
-            continue
+    workers = max_workers or min(len(pdf_files), os.cpu_count() or 1)
+    print(f"Extracting text from {len(pdf_files)} PDFs ({workers} worker{'s' if workers > 1 else ''})...")
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures = [executor.submit(extract_text_from_pdf, pdf_path) for pdf_path in pdf_files]
+    else:
+        executor, futures = None, None
+
+    try:
+        for i, pdf_path in enumerate(pdf_files):
+            try:
+                text = futures[i].result() if futures else extract_text_from_pdf(pdf_path)
+
+                # Create document
+                doc = Document(
+                    doc_id=uuid.uuid4().hex,
+                    title=pdf_path.stem,  # Use filename without extension as title
+                    content=text,
+                    source_url=pdf_path.name,  # Just the filename, not full path
+                    source_org="Uploaded PDF"
+                )
+
+                documents.append(doc)
+                print(f"  ✓ Extracted {len(text)} characters from {pdf_path.name}")
+
+            except Exception as e:
+                print(f"  ✗ Error extracting {pdf_path.name}: {str(e)}")
+                continue
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     return documents
 
 
-def load_json_documents(json_dir: Path) -> List[Document]:
+def _load_json_document(json_path: Path) -> Document:
+    """Read one scraped-document JSON file into a Document.
+
+    With orjson, files above ``_MMAP_MIN_BYTES`` are parsed straight from a
+    read-only memory map instead of being copied into a bytes object first.
+    """
+    if orjson is not None and json_path.stat().st_size >= _MMAP_MIN_BYTES:
+        with open(json_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                data = orjson.loads(view)
+    else:
+        raw = json_path.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw.decode('utf-8'))
+    return Document(
+        doc_id=json_path.stem,  # Use filename as ID
+        title=data.get('doc_title', json_path.stem),
+        content=data.get('text', ''),
+        source_url=data.get('source_url', ''),
+        source_org=data.get('source_org', ''),
+        pub_date=data.get('pub_date', '')
+    )
+
+
+def load_json_documents(json_dir: Path, max_workers: int = 16) -> List[Document]:
     """Load documents from JSON files (e.g., web-scraped content).
 
+    Files are read and decoded on a thread pool; documents keep the
+    directory's file order.
+
     Args:
         json_dir: Directory containing JSON document files
+        max_workers: Reader threads
 
     Returns:
         List of Document objects loaded from JSON
@@ -85,26 +160,16 @@ def load_json_documents(json_dir: Path) -> List[Document]:
         print(f"No JSON files found in {json_dir}")
         return documents
 
-    for json_path in json_files:
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # Create document from JSON data
-            doc = Document(
-                doc_id=json_path.stem,  # Use filename as ID
-                title=data.get('doc_title', json_path.stem),
-                content=data.get('text', ''),
-                source_url=data.get('source_url', ''),
-                source_org=data.get('source_org', ''),
-                pub_date=data.get('pub_date', '')
-            )
-
-            documents.append(doc)
-            print(f"  ✓ Loaded {len(doc.content)} characters from {json_path.name}")
-
-        except Exception as e:
-            print(f"  ✗ Error loading {json_path.name}: {str(e)}")
-            continue
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(json_files)))) as executor:
+        futures = [executor.submit(_load_json_document, json_path) for json_path in json_files]
+        for json_path, future in zip(json_files, futures):
+            try:
+                doc = future.result()
+                documents.append(doc)
+                print(f"  ✓ Loaded {len(doc.content)} characters from {json_path.name}")
+
+            except Exception as e:
+                print(f"  ✗ Error loading {json_path.name}: {str(e)}")
+                continue
 
     return documents
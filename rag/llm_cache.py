@@ -0,0 +1,54 @@
+"""Persistent prompt -> completion cache for chat calls.
+
+Completions are stored in a small SQLite database keyed by a SHA-256 digest of
+the model/deployment name, the generation parameters and the exact messages,
+so re-running header generation over unchanged chunks does not call the chat
+endpoint again, and switching models never returns another model's output.
+
+Public functions:
+- prompt_key(model, messages, **params)
+- get(key) -> completion or None
+- put(key, completion)
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+from . import config
+
+
+def prompt_key(model: str, messages: List[Dict[str, Any]], **params: Any) -> str:
+    payload = json.dumps(
+        {"model": model, "params": params, "messages": messages},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, completion TEXT)")
+    return conn
+
+
+def get(key: str, path: Path = config.LLM_CACHE_PATH) -> Optional[str]:
+    with _connect(path) as conn:
+        row = conn.execute("SELECT completion FROM completions WHERE key = ?", (key,)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def put(key: str, completion: str, path: Path = config.LLM_CACHE_PATH) -> None:
+    """Store a completion. Empty completions (failed calls) are not cached."""
+    if not completion or not completion.strip():
+        return
+    with _connect(path) as conn:
+        conn.execute("INSERT OR REPLACE INTO completions (key, completion) VALUES (?, ?)", (key, completion))
+    conn.close()
+
+
+__all__ = ["prompt_key", "get", "put"]
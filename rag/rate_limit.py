@@ -0,0 +1,51 @@
+"""Token-bucket request limiter shared by the embedding paths.
+
+The bucket refills continuously at ``rate_per_min / 60`` tokens per second up to
+``burst`` tokens. A caller that finds the bucket empty waits only for the
+residual time until its token is available, so quick responses are not padded
+out to a fixed interval and bursts up to ``burst`` requests go straight through.
+
+Reservations are made under a plain ``threading.Lock`` held only for the
+arithmetic, so one instance can be used from worker threads (`acquire_blocking`)
+and from coroutines (`await acquire()`) at the same time.
+"""
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    def __init__(self, rate_per_min: float, burst: Optional[float] = None):
+        self.rate_per_sec = max(float(rate_per_min), 0.0) / 60.0
+        self.capacity = float(burst if burst is not None else max(rate_per_min, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, n: float) -> float:
+        """Take ``n`` tokens (possibly going into debt) and return seconds to wait before using them."""
+        if self.rate_per_sec <= 0:
+            return 0.0  # limiting disabled
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_sec)
+            self._updated = now
+            self._tokens -= n
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_sec
+
+    async def acquire(self, n: float = 1) -> None:
+        delay = self._reserve(n)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, n: float = 1) -> None:
+        delay = self._reserve(n)
+        if delay:
+            time.sleep(delay)
+
+
+__all__ = ["TokenBucket"]
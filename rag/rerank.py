@@ -0,0 +1,72 @@
+"""Cross-encoder reranking of retrieved candidates.
+
+With RERANK_ENABLED the retriever fetches RERANK_TOP_N nearest neighbours,
+scores each ``(query, chunk)`` pair with a cross-encoder (RERANK_MODEL, loaded
+once per process through sentence-transformers) and keeps the best ``top_k``.
+Recall then comes from the wider candidate list rather than from a larger
+HNSW efSearch, and precision from the cross-encoder.
+
+Public functions:
+- rerank(query, results, top_k) -> results
+- rerank_batch(queries, result_lists, top_k) -> [results, ...]
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Sequence
+import functools
+
+from . import config
+
+try:  # optional: only needed when RERANK_ENABLED=1
+    from sentence_transformers import CrossEncoder  # type: ignore
+except ImportError:
+    CrossEncoder = None  # type: ignore
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    if CrossEncoder is None:
+        raise RuntimeError("Reranking needs sentence-transformers. Install it or set RERANK_ENABLED=0.")
+    return CrossEncoder(config.RERANK_MODEL)
+
+
+def _passage(result: Dict[str, Any]) -> str:
+    """Text the chunk was embedded from: header plus body, as `rag.headers` joins them."""
+    if result.get("augmented_chunk"):
+        return result["augmented_chunk"]
+    return f"{result.get('ctx_header', '')}\n\n{result.get('raw_chunk', '')}".strip()
+
+
+def rerank_batch(
+    queries: Sequence[str],
+    result_lists: Sequence[List[Dict[str, Any]]],
+    top_k: int,
+) -> List[List[Dict[str, Any]]]:
+    """Rerank each query's candidates, scoring every pair in one ``predict`` call.
+
+    Results keep their fields, gain ``rerank_score`` and are renumbered from
+    ``rank`` 1; ``similarity_score`` stays the vector score.
+    """
+    pairs = [(q, _passage(r)) for q, results in zip(queries, result_lists) for r in results]
+    if not pairs:
+        return [[] for _ in result_lists]
+    scores = _get_model().predict(pairs).tolist()
+
+    out: List[List[Dict[str, Any]]] = []
+    start = 0
+    for results in result_lists:
+        scored = sorted(
+            zip(scores[start:start + len(results)], results), key=lambda sr: sr[0], reverse=True
+        )[:top_k]
+        start += len(results)
+        out.append([
+            {**r, "rank": rank, "rerank_score": score}
+            for rank, (score, r) in enumerate(scored, 1)
+        ])
+    return out
+
+
+def rerank(query: str, results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    return rerank_batch([query], [results], top_k)[0]
+
+
+__all__ = ["rerank", "rerank_batch"]
@@ -1,14 +1,16 @@
 """Unified retrieval abstraction supporting both FAISS and Azure AI Search."""
 from __future__ import annotations
 from typing import List, Dict, Any, Sequence, Optional
+from collections import OrderedDict
 import numpy as np
 
 from .embeddings import get_embeddings_batch
-from . import config
+from . import config, embed_cache, rerank
 
 # Import FAISS conditionally (only needed for local mode)
 try:
     import faiss  # type: ignore
+    from .index import search_index
     FAISS_AVAILABLE = True
 except ImportError:
     FAISS_AVAILABLE = False
@@ -33,7 +35,8 @@ class EmbeddingRetriever:
     metadata : Sequence[Dict[str, Any]]
         Parallel metadata list aligned with index order (local mode only).
     embed_fn : callable | None
-        Function accepting List[str] -> List[List[float]]. Defaults to
+        Function accepting List[str] and returning List[List[float]] or an
+        (N, D) array. Defaults to
         `rag.embeddings.get_embeddings_batch`. Allows injection of a fake
         embedding function for offline tests.
     use_azure : bool | None
@@ -54,6 +57,7 @@ class EmbeddingRetriever:
 
         self.use_azure = use_azure
         self._embed_fn = embed_fn or get_embeddings_batch
+        self._query_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()  # LRU of embedded queries
 
         if self.use_azure:
             if not AZURE_AVAILABLE:
@@ -71,19 +75,85 @@ class EmbeddingRetriever:
             self.metadata = list(metadata) if metadata else []
 
     def embed_query(self, query: str) -> np.ndarray:
-        """Generate embedding for a query string."""
-        emb = self._embed_fn([query])
-        if not emb:
-            raise RuntimeError("Failed to embed query (empty embedding list)")
-        vec = np.array([emb[0]], dtype=np.float32)
+        """Generate embedding for a query string.
 
-        # Normalize for FAISS (Azure Search handles normalization internally)
-        if not self.use_azure and FAISS_AVAILABLE:
-            faiss.normalize_L2(vec)
+        The last QUERY_VECTOR_CACHE_SIZE query vectors are kept, so a repeated
+        query skips the embeddings endpoint entirely.
+        """
+        return self.embed_queries([query])
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """Embed several queries as one ``(N, D)`` float32 array.
+
+        Queries not in the query-vector cache are sent EMBED_BATCH_SIZE per
+        ``embed_fn`` call instead of one request each, and normalized in one
+        pass. With the default embedder, queries embedded within
+        QUERY_EMBED_CACHE_TTL (by any process) are read from the on-disk
+        embedding cache instead.
+        """
+        rows: Dict[int, np.ndarray] = {}
+        misses: List[int] = []
+        for i, query in enumerate(queries):
+            cached = self._query_vectors.get(query)
+            if cached is not None:
+                self._query_vectors.move_to_end(query)
+                rows[i] = cached[0]
+            else:
+                misses.append(i)
+
+        if misses:
+            # The on-disk cache only holds vectors from the real embedder
+            persist = self._embed_fn is get_embeddings_batch and config.EMBED_CACHE_ENABLED
+            stored = (
+                embed_cache.get_queries([queries[i] for i in misses], config.AOAI_EMBED_MODEL)
+                if persist else {}
+            )
+            fetch = [j for j in range(len(misses)) if j not in stored]
 
-        return vec
+            # Up to EMBED_BATCH_SIZE queries per request, written into one matrix
+            step = max(1, config.EMBED_BATCH_SIZE)
+            new: Optional[np.ndarray] = None
+            if stored:
+                vec = next(iter(stored.values()))
+                new = np.empty((len(misses), vec.shape[0]), dtype=np.float32)
+                for j, vec in stored.items():
+                    new[j] = vec
+            for b in range(0, len(fetch), step):
+                part = fetch[b:b + step]
+                texts = [queries[misses[j]] for j in part]
+                emb = self._embed_fn(texts)
+                if len(emb) == 0:
+                    raise RuntimeError("Failed to embed query (empty embedding list)")
+                if len(emb) != len(part):
+                    raise RuntimeError(f"Expected {len(part)} query embeddings, got {len(emb)}")
+                block = np.asarray(emb, dtype=np.float32)
+                if new is None:
+                    new = np.empty((len(misses), block.shape[1]), dtype=np.float32)
+                new[part] = block
+                if persist:
+                    embed_cache.store_queries(texts, block, config.AOAI_EMBED_MODEL)
 
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+            # Normalize for FAISS (Azure Search handles normalization internally)
+            if not self.use_azure and FAISS_AVAILABLE:
+                faiss.normalize_L2(new)
+
+            for i, vec in zip(misses, new):
+                rows[i] = vec
+                # All-zero rows are the fallback of a failed embed call; retry those next time
+                if config.QUERY_VECTOR_CACHE_SIZE > 0 and vec.any():
+                    self._query_vectors[queries[i]] = vec[None, :].copy()
+            while len(self._query_vectors) > config.QUERY_VECTOR_CACHE_SIZE:
+                self._query_vectors.popitem(last=False)
+
+        return np.stack([rows[i] for i in range(len(queries))])
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        high_recall: bool = False,
+        filters: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         """Search for similar documents using vector similarity.
 
         Parameters
@@ -92,41 +162,115 @@ class EmbeddingRetriever:
             Query text to search for
         top_k : int
             Number of top results to return
+        high_recall : bool
+            Score every vector instead of walking the HNSW graph (Azure
+            ``exhaustive`` kNN, or a FAISS brute-force scan). Exact recall at
+            brute-force cost, so keep it for the queries that need it rather
+            than raising efSearch for all of them.
+        filters : str | None
+            OData filter (Azure mode only), e.g. ``"source_org eq 'WHO'"``;
+            narrows the vectors an exhaustive query has to scan
 
         Returns
         -------
         list of dict
             Search results with rank, similarity_score, and metadata
+            (plus rerank_score with RERANK_ENABLED)
+        """
+        fetch_k = self._fetch_k(top_k)
+        if self.use_azure:
+            results = self._search_azure(query, fetch_k, high_recall, filters)
+        else:
+            self._check_local_filters(filters)
+            results = self._search_faiss(query, fetch_k, high_recall)
+        if config.RERANK_ENABLED:
+            return rerank.rerank(query, results, top_k)
+        return results
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        top_k: int = 5,
+        high_recall: bool = False,
+        filters: Optional[str] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """`search` for several queries, embedding them in batched requests.
+
+        In FAISS mode the whole query matrix goes to the index in a single
+        ``index.search`` call (FAISS spreads the rows over its threads).
+        Returns one result list per query. With RERANK_ENABLED every
+        query's candidates are scored in one cross-encoder call.
+        ``high_recall`` and ``filters`` apply to every query, as in `search`.
         """
+        if not queries:
+            return []
+        if not self.use_azure:
+            self._check_local_filters(filters)
+        vecs = self.embed_queries(queries)
+        fetch_k = self._fetch_k(top_k)
         if self.use_azure:
-            return self._search_azure(query, top_k)
+            results = [
+                self._azure_results(vecs[i:i + 1], fetch_k, high_recall, filters) for i in range(len(vecs))
+            ]
         else:
-            return self._search_faiss(query, top_k)
+            scores, indices = search_index(self.index, vecs, fetch_k, exhaustive=high_recall)
+            results = [self._faiss_results(s, idx) for s, idx in zip(scores, indices)]
+        if config.RERANK_ENABLED:
+            return rerank.rerank_batch(queries, results, top_k)
+        return results
 
-    def _search_faiss(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _fetch_k(top_k: int) -> int:
+        """Candidates to retrieve: RERANK_TOP_N when reranking, else ``top_k``."""
+        return max(top_k, config.RERANK_TOP_N) if config.RERANK_ENABLED else top_k
+
+    @staticmethod
+    def _check_local_filters(filters: Optional[str]) -> None:
+        if filters:
+            raise ValueError("filters need Azure AI Search; the FAISS index has no filterable fields")
+
+    def _search_faiss(self, query: str, top_k: int, high_recall: bool = False) -> List[Dict[str, Any]]:
         """Search using FAISS index (local mode)."""
         vec = self.embed_query(query)
-        scores, indices = self.index.search(vec, top_k)
+        scores, indices = search_index(self.index, vec, top_k, exhaustive=high_recall)
+        return self._faiss_results(scores[0], indices[0])
+
+    def _faiss_results(self, scores: np.ndarray, indices: np.ndarray) -> List[Dict[str, Any]]:
+        """Convert one row of FAISS scores/ids to ranked result dicts.
+
+        The row is unboxed with one ``tolist()`` each instead of a NumPy
+        scalar per element. Each hit is still a fresh dict: callers read
+        results as plain dicts and may annotate them, which must not touch
+        the shared metadata.
+        """
         out: List[Dict[str, Any]] = []
+        n_meta = len(self.metadata)
 
-        for rank, (score, idx) in enumerate(zip(scores[0], indices[0]), 1):
+        for rank, (score, idx) in enumerate(zip(scores.tolist(), indices.tolist()), 1):
             if idx < 0:
                 break
-            meta = self.metadata[idx] if idx < len(self.metadata) else {}
+            meta = self.metadata[idx] if idx < n_meta else {}
             out.append({
                 "rank": rank,
-                "similarity_score": float(score),
+                "similarity_score": score,
                 **meta
             })
         return out
 
-    def _search_azure(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+    def _search_azure(
+        self, query: str, top_k: int, high_recall: bool = False, filters: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """Search using Azure AI Search (cloud mode)."""
         # Generate query embedding
         vec = self.embed_query(query)
+        return self._azure_results(vec, top_k, high_recall, filters)
 
-        # Use pre-computed embeddings for search
-        results = azure_search.search(vec, top_k=top_k)
+    def _azure_results(
+        self, vec: np.ndarray, top_k: int, high_recall: bool = False, filters: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Run one vector query against Azure AI Search and format the hits."""
+        # Use pre-computed embeddings for search; repeated queries hit the result cache
+        results = azure_search.search_cached(vec, top_k=top_k, filters=filters, exhaustive=high_recall)
 
         # Convert to the expected format
         out: List[Dict[str, Any]] = []
@@ -3,11 +3,15 @@ from __future__ import annotations
 import time
 from typing import Dict, List, Iterable, Callable
 import uuid
-import re
 from pathlib import Path
 import requests
 from bs4 import BeautifulSoup  # type: ignore
 
+try:  # optional: lexbor (C) HTML parser + CSS engine, much faster than bs4's html.parser
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
+except ImportError:
+    LexborHTMLParser = None
+
 from .config import DATA_DIR
 from .models import Document
 
@@ -34,9 +38,29 @@ def fetch(url: str, tries: int = 3, backoff: float = 1.5) -> str | None:
     return None
 
 def clean_text(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return " ".join((s or "").split())  # same result as re.sub(r"\s+", " ", s.strip())
+
+def _node_text(node) -> str:
+    return clean_text(node.text(deep=True, separator=" ", strip=True))
+
+def _extract_blocks_lexbor(html: str, selectors: str, title_selector: str | None) -> tuple[str, List[str]]:
+    tree = LexborHTMLParser(html)
+    main = tree.css_first("main") or tree.css_first('[role="main"]') or tree.root
+    blocks = [txt for txt in map(_node_text, main.css(selectors)) if txt]
+    title_el = (
+        (main.css_first(title_selector) if title_selector else None)
+        or main.css_first("h1") or tree.css_first("h1") or tree.css_first("title")
+    )
+    title = _node_text(title_el) if title_el else "Untitled"
+    return title, blocks
 
 def extract_blocks(html: str, selectors: str, title_selector: str | None = None) -> tuple[str, List[str]]:
+    """Return ``(title, text blocks)`` for the elements matching ``selectors`` inside the page's main area.
+
+    Uses selectolax's lexbor engine when installed, else BeautifulSoup.
+    """
+    if LexborHTMLParser is not None:
+        return _extract_blocks_lexbor(html, selectors, title_selector)
     soup = BeautifulSoup(html, "html.parser")
     main = soup.find("main") or soup.find(attrs={"role": "main"}) or soup
     blocks: List[str] = []
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Copy Cosmos DB chunks into a container partitioned on /doc_id
+
+Chunk containers created before the /doc_id layout are partitioned on /id,
+so get_chunks_by_doc_id has to fan out across every partition. Cosmos cannot
+change a container's partition key in place, so this script:
+1. Reads every chunk from the current COSMOS_CONTAINER_CHUNKS container
+2. Writes them to a new container partitioned on /doc_id
+3. Tells you which COSMOS_CONTAINER_CHUNKS value to switch .env to
+
+Safe to re-run: unchanged chunks are skipped by content hash.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent / ".env", override=True)
+
+from rag import config, azure_cosmos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy chunks into a /doc_id-partitioned Cosmos container")
+    parser.add_argument(
+        "--source",
+        default=config.COSMOS_CONTAINER_CHUNKS,
+        help="Existing chunks container (default: COSMOS_CONTAINER_CHUNKS)",
+    )
+    parser.add_argument(
+        "--target",
+        default=f"{config.COSMOS_CONTAINER_CHUNKS}-by-doc",
+        help="New container to create with partition key /doc_id",
+    )
+    args = parser.parse_args()
+
+    if args.source == args.target:
+        print("❌ --source and --target must be different containers")
+        sys.exit(1)
+
+    print(f"Database: {config.COSMOS_DB_NAME}")
+    print(f"Copying chunks: {args.source} -> {args.target} (partition key {azure_cosmos.CHUNK_PARTITION_KEY})")
+
+    try:
+        copied = azure_cosmos.copy_chunks(args.source, args.target)
+    except Exception as e:
+        print(f"❌ Copy failed: {e}")
+        sys.exit(1)
+
+    print(f"✓ Copied {copied} chunks")
+    print(f"\nNext: set COSMOS_CONTAINER_CHUNKS={args.target} in .env")
+    print(f"      (delete '{args.source}' once everything reads from the new container)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Sweep Azure AI Search HNSW settings for recall@k and query latency
+
+For every (m, efConstruction, efSearch, compression) combination this script:
+1. Creates an ephemeral index from rag.azure_search.build_index_definition
+2. Uploads a sample of the cached embeddings (vectors only)
+3. Runs held-out queries twice: exhaustive (exact kNN, the ground truth) and
+   through the HNSW graph, timing the latter
+4. Prints recall@k and p50/p95 latency, then deletes the index
+
+Each combination is a full index build on your search service, so keep the
+grid and --sample small. Needs AZURE_SEARCH_ENDPOINT / AZURE_SEARCH_KEY and the
+local embedding cache (run a build first). Put the winning values in .env as
+HNSW_M / HNSW_EFC / HNSW_EFS / SEARCH_VECTOR_COMPRESSION.
+"""
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent / ".env", override=True)
+
+import numpy as np
+import requests
+from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
+from azure.search.documents import SearchClient, SearchIndexingBufferedSender
+from azure.search.documents.indexes import SearchIndexClient
+from azure.search.documents.models import VectorizedQuery
+
+from rag import config
+from rag.azure_search import build_index_definition
+from rag.cache import load_embeddings
+
+
+# One pooled session for every client and sender, so each per-combination
+# client reuses the open TLS connections instead of handshaking again
+_session = requests.Session()
+
+
+def _transport():
+    return RequestsTransport(session=_session, session_owner=False)
+
+
+def _ids(client, vector, k, exhaustive):
+    query = VectorizedQuery(
+        vector=vector.tolist(), k_nearest_neighbors=k, fields="embedding", exhaustive=exhaustive or None
+    )
+    return [r["chunk_id"] for r in client.search(search_text=None, vector_queries=[query], select=["chunk_id"])]
+
+
+def _wait_for_count(client, n, timeout=300):
+    deadline = time.monotonic() + timeout
+    while client.get_document_count() < n:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"index did not reach {n} documents within {timeout}s")
+        time.sleep(2)
+
+
+def run_one(index_client, credential, name, base, queries, k, m, efc, efs, compress):
+    index_client.create_index(build_index_definition(
+        name=name, embedding_dimensions=base.shape[1],
+        m=m, ef_construction=efc, ef_search=efs, compress=compress,
+    ))
+    try:
+        start = time.perf_counter()
+        with SearchIndexingBufferedSender(
+            config.AZURE_SEARCH_ENDPOINT, name, credential, transport=_transport()
+        ) as sender:
+            sender.upload_documents(
+                documents=[{"chunk_id": str(i), "embedding": v} for i, v in enumerate(base.tolist())]
+            )
+        client = SearchClient(config.AZURE_SEARCH_ENDPOINT, name, credential, transport=_transport())
+        _wait_for_count(client, len(base))
+        build_s = time.perf_counter() - start
+
+        recalls, latencies = [], []
+        for vector in queries:
+            truth = set(_ids(client, vector, k, exhaustive=True))
+            t0 = time.perf_counter()
+            found = _ids(client, vector, k, exhaustive=False)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            recalls.append(len(truth & set(found)) / max(1, len(truth)))
+        return build_s, float(np.mean(recalls)), np.percentile(latencies, [50, 95])
+    finally:
+        index_client.delete_index(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep Azure AI Search HNSW parameters")
+    parser.add_argument("--m", type=int, nargs="+", default=[config.HNSW_M], help="Graph degrees (4-10)")
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[config.HNSW_EFC],
+                        help="Build candidate lists (100-1000)")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[100, 200], help="Query candidate lists (100-1000)")
+    parser.add_argument("--compress", choices=["on", "off", "both"], default="on",
+                        help="int8 scalar quantization (default: on)")
+    parser.add_argument("--sample", type=int, default=2000, help="Vectors to index (default: 2000)")
+    parser.add_argument("--queries", type=int, default=50, help="Held-out query vectors (default: 50)")
+    parser.add_argument("-k", type=int, default=10, help="Recall cutoff (default: 10)")
+    args = parser.parse_args()
+
+    if not config.AZURE_SEARCH_ENDPOINT or not config.AZURE_SEARCH_KEY:
+        print("❌ Set AZURE_SEARCH_ENDPOINT and AZURE_SEARCH_KEY")
+        sys.exit(1)
+    emb = load_embeddings()
+    if emb is None or len(emb) <= args.queries:
+        print("❌ Not enough cached embeddings; build the index first")
+        sys.exit(1)
+
+    rows = np.random.default_rng(0).permutation(len(emb))[: args.sample + args.queries]
+    data = np.asarray(emb[np.sort(rows)], dtype=np.float32)
+    base, queries = data[args.queries:], data[: args.queries]
+    compress_opts = {"on": [True], "off": [False], "both": [True, False]}[args.compress]
+
+    credential = AzureKeyCredential(config.AZURE_SEARCH_KEY)
+    index_client = SearchIndexClient(config.AZURE_SEARCH_ENDPOINT, credential, transport=_transport())
+    grid = list(itertools.product(args.m, args.ef_construction, args.ef_search, compress_opts))
+    print(f"{len(grid)} indexes x {len(base)} vectors, {len(queries)} queries, k={args.k}")
+    print(f"{'m':>3} {'efC':>5} {'efS':>5} {'int8':>5}  {'build s':>8}  {'recall':>7}  {'p50 ms':>7}  {'p95 ms':>7}")
+    for n, (m, efc, efs, compress) in enumerate(grid):
+        name = f"{config.AZURE_SEARCH_INDEX_NAME}-sweep-{n}"
+        try:
+            build_s, recall, (p50, p95) = run_one(
+                index_client, credential, name, base, queries, args.k, m, efc, efs, compress
+            )
+        except Exception as e:
+            print(f"{m:>3} {efc:>5} {efs:>5} {str(compress):>5}  ❌ {e}")
+            continue
+        print(f"{m:>3} {efc:>5} {efs:>5} {str(compress):>5}  {build_s:>8.1f}  {recall:>7.3f}  {p50:>7.1f}  {p95:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Sweep HNSW efConstruction against build time and recall@k
+
+Builds FAISS HNSW graphs (the same algorithm Azure AI Search uses) over a
+sample of the cached embeddings, one per --ef-construction value, and
+compares their top-k against an exact flat search for held-out queries. Pick
+the smallest efConstruction past the recall knee and set HNSW_EFC (Azure) or
+FAISS_HNSW_EF_CONSTRUCTION (local) in .env; efSearch is tuned separately, as
+it is paid per query rather than once per build.
+
+Needs the local embedding cache (run a local build first).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent / ".env", override=True)
+
+import faiss
+import numpy as np
+
+from rag import config
+from rag.cache import load_embeddings
+from rag.index import build_faiss_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep HNSW efConstruction for recall@k and build time")
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[128, 200, 400],
+                        help="efConstruction values to build (default: 128 200 400)")
+    parser.add_argument("--ef-search", type=int, default=config.HNSW_EFS,
+                        help="efSearch used for every build (default: HNSW_EFS)")
+    parser.add_argument("--m", type=int, default=config.HNSW_M,
+                        help="Graph links per node (default: HNSW_M)")
+    parser.add_argument("--sample", type=int, default=10_000, help="Vectors to index (default: 10000)")
+    parser.add_argument("--queries", type=int, default=200, help="Held-out query vectors (default: 200)")
+    parser.add_argument("-k", type=int, default=10, help="Recall cutoff (default: 10)")
+    args = parser.parse_args()
+
+    emb = load_embeddings()
+    if emb is None or len(emb) <= args.queries:
+        print("❌ Not enough cached embeddings; build the local index first")
+        sys.exit(1)
+
+    rows = np.random.default_rng(0).permutation(len(emb))[: args.sample + args.queries]
+    data = np.ascontiguousarray(emb[np.sort(rows)], dtype=np.float32)
+    base, queries = data[args.queries:], data[: args.queries]
+    faiss.normalize_L2(queries)
+    k = min(args.k, len(base))
+
+    _, truth = build_faiss_index(base, index_type="flat").search(queries, k)
+    print(f"{len(base)} vectors, {len(queries)} queries, m={args.m}, efSearch={args.ef_search}, k={k}")
+    print(f"{'efConstruction':>14}  {'build s':>8}  {'recall@' + str(k):>10}")
+    for ef_construction in args.ef_construction:
+        start = time.perf_counter()
+        index = build_faiss_index(base, index_type="hnsw", m=args.m,
+                                  ef_construction=ef_construction, ef_search=args.ef_search)
+        elapsed = time.perf_counter() - start
+        _, found = index.search(queries, k)
+        recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found.tolist(), truth.tolist())])
+        print(f"{ef_construction:>14}  {elapsed:>8.2f}  {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()